@@ -2,6 +2,7 @@ import asyncio
 from logging.config import fileConfig
 
 from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from alembic import context
 
 # Импортируй свой Base и settings (путь может отличаться! поправь под свой проект)
@@ -40,7 +41,9 @@ def do_run_migrations(connection):
 
 async def run_async_migrations():
     """Запуск миграций в async-режиме"""
-    connectable = create_async_engine(settings.database_url)
+    # Миграции используют одно соединение: пул не нужен. Движок не держим на уровне модуля -
+    # env.py выполняется заново на каждую команду Alembic, а каждый asyncio.run - это свой event loop
+    connectable = create_async_engine(settings.database_url, poolclass=NullPool)
     async with connectable.connect() as connection:
         await connection.run_sync(do_run_migrations)
     await connectable.dispose()
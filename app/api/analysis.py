@@ -1,6 +1,7 @@
 # app/api/analysis.py - С SCHEDULED ENDPOINTS
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Query
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
 from app.services.analysis_service import AnalysisService
+from app.services.telegram_service import TelegramService, get_telegram_service
 from app.schemas.analysis import (
     AnalysisResponse,
     ComparisonRequest,
@@ -17,14 +18,10 @@ router = APIRouter(prefix="/analysis", tags=["AI Analysis"])
 # 🤖 НОВЫЕ SCHEDULED ENDPOINTS
 
 @router.post("/scheduled-analysis")
-async def trigger_scheduled_analysis():
+async def trigger_scheduled_analysis(telegram_service: TelegramService = Depends(get_telegram_service)):
     """🤖 Ручной запуск scheduled AI анализа (как если бы он был по расписанию)"""
     try:
-        from app.services.analysis_service import AnalysisService
-        from app.services.telegram_service import TelegramService
-
         analysis_service = AnalysisService()
-        telegram_service = TelegramService()
 
         # Полный анализ базы данных
         result = await analysis_service.analyze_full_database(min_cars_per_brand=3)
@@ -162,7 +159,8 @@ async def get_market_summary():
 
 @router.post("/send-full-market-to-telegram")
 async def send_full_market_analysis_to_telegram(
-        min_cars_per_brand: int = Query(default=5, ge=1, le=50)
+        min_cars_per_brand: int = Query(default=5, ge=1, le=50),
+        telegram: TelegramService = Depends(get_telegram_service)
 ):
     """📱 Полный анализ рынка + отправка в Telegram"""
     try:
@@ -173,8 +171,6 @@ async def send_full_market_analysis_to_telegram(
             raise HTTPException(status_code=404, detail=result.get("error", "Ошибка анализа"))
 
         # Отправляем в Telegram с HTML отчетом
-        from app.services.telegram_service import TelegramService
-        telegram = TelegramService()
         await telegram.send_ai_analysis_report(result, urgent_mode=False)
 
         return {
@@ -194,7 +190,8 @@ async def send_full_market_analysis_to_telegram(
 
 @router.post("/send-trends-to-telegram")
 async def send_trends_analysis_to_telegram(
-        days: int = Query(default=14, ge=7, le=60)
+        days: int = Query(default=14, ge=7, le=60),
+        telegram: TelegramService = Depends(get_telegram_service)
 ):
     """📱 Анализ трендов + отправка в Telegram"""
     try:
@@ -204,8 +201,6 @@ async def send_trends_analysis_to_telegram(
         if not result.get("success", True):
             raise HTTPException(status_code=404, detail=result.get("error", "Ошибка анализа"))
 
-        from app.services.telegram_service import TelegramService
-        telegram = TelegramService()
         await telegram.send_ai_analysis_report(result, urgent_mode=False)
 
         return {
@@ -453,8 +448,7 @@ async def test_openai_connection():
 async def _send_to_telegram_bg(analysis_result: dict, analysis_type: str):
     """Background task для отправки в Telegram"""
     try:
-        from app.services.telegram_service import TelegramService
-        telegram = TelegramService()
+        telegram = get_telegram_service()
         await telegram.send_ai_analysis_report(analysis_result, urgent_mode=False)
         logger.info(f"✅ Background task: {analysis_type} отправлен в Telegram")
     except Exception as e:
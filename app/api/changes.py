@@ -1,10 +1,10 @@
 # app/api/changes.py - API для отслеживания изменений
 from fastapi import APIRouter, HTTPException, Query
 from app.services.changes_service import ChangesTrackingService
-from app.repository.car_repository import CarRepository
+from app.repository.car_repository import CarRepository, extract_price_number
 from app.database import async_session
 from typing import List
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 
 logger = logging.getLogger(__name__)
@@ -167,8 +167,8 @@ async def get_significant_price_drops(
 
             result = []
             for car in cars:
-                old_price_num = repo._extract_price_number(car.previous_price)
-                new_price_num = repo._extract_price_number(car.price)
+                old_price_num = extract_price_number(car.previous_price)
+                new_price_num = extract_price_number(car.price)
 
                 if old_price_num and new_price_num:
                     drop_amount = old_price_num - new_price_num
@@ -276,7 +276,6 @@ async def get_changes_tracking_status():
             never_checked = await repo.get_cars_never_checked(1000)  # Максимум для подсчета
             recent_changes = await repo.get_changes_summary(7)
 
-            from datetime import datetime, timedelta
             cutoff_24h = datetime.now() - timedelta(hours=24)
             recent_checked = await repo.get_cars_for_changes_check(cutoff_24h, 1000)
 
@@ -1,8 +1,8 @@
 # app/api/reports.py - API для управления HTML отчетами
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import FileResponse
-from app.services.html_service import HTMLReportService
-from app.services.telegram_service import TelegramService
+from app.services.html_service import HTMLReportService, get_html_service
+from app.services.telegram_service import TelegramService, get_telegram_service
 from typing import List, Dict, Any
 import logging
 import os
@@ -12,10 +12,12 @@ router = APIRouter(prefix="/reports", tags=["HTML Reports"])
 
 
 @router.get("/list")
-async def get_reports_list(limit: int = Query(default=10, ge=1, le=50)):
+async def get_reports_list(
+        limit: int = Query(default=10, ge=1, le=50),
+        html_service: HTMLReportService = Depends(get_html_service)
+):
     """📋 Получить список HTML отчетов"""
     try:
-        html_service = HTMLReportService()
         reports = html_service.get_reports_list(limit)
 
         return {
@@ -30,10 +32,9 @@ async def get_reports_list(limit: int = Query(default=10, ge=1, le=50)):
 
 
 @router.get("/download/{filename}")
-async def download_report(filename: str):
+async def download_report(filename: str, html_service: HTMLReportService = Depends(get_html_service)):
     """📥 Скачать HTML отчет по имени файла"""
     try:
-        html_service = HTMLReportService()
         file_path = html_service.reports_dir / filename
 
         if not file_path.exists():
@@ -56,10 +57,12 @@ async def download_report(filename: str):
 
 
 @router.delete("/cleanup")
-async def cleanup_old_reports(keep_days: int = Query(default=7, ge=1, le=30)):
+async def cleanup_old_reports(
+        keep_days: int = Query(default=7, ge=1, le=30),
+        html_service: HTMLReportService = Depends(get_html_service)
+):
     """🗑️ Удалить старые HTML отчеты"""
     try:
-        html_service = HTMLReportService()
         deleted_count = html_service.clean_old_reports(keep_days)
 
         return {
@@ -75,10 +78,9 @@ async def cleanup_old_reports(keep_days: int = Query(default=7, ge=1, le=30)):
 
 
 @router.post("/send-list-to-telegram")
-async def send_reports_list_to_telegram():
+async def send_reports_list_to_telegram(telegram_service: TelegramService = Depends(get_telegram_service)):
     """📱 Отправить список отчетов в Telegram"""
     try:
-        telegram_service = TelegramService()
         await telegram_service.send_reports_list()
 
         return {
@@ -92,10 +94,9 @@ async def send_reports_list_to_telegram():
 
 
 @router.get("/stats")
-async def get_reports_statistics():
+async def get_reports_statistics(html_service: HTMLReportService = Depends(get_html_service)):
     """📊 Статистика по HTML отчетам"""
     try:
-        html_service = HTMLReportService()
         reports = html_service.get_reports_list(100)  # Получаем больше для статистики
 
         if not reports:
@@ -131,7 +132,7 @@ async def get_reports_statistics():
 
 
 @router.post("/test-html-generation")
-async def test_html_generation():
+async def test_html_generation(html_service: HTMLReportService = Depends(get_html_service)):
     """🧪 Тест создания HTML отчета (с тестовыми данными)"""
     try:
         # Создаем тестовые данные для отчета
@@ -195,7 +196,6 @@ async def test_html_generation():
             ]
         }
 
-        html_service = HTMLReportService()
         file_path = html_service.generate_analysis_report(test_analysis_result)
         filename = os.path.basename(file_path)
 
@@ -8,6 +8,8 @@ from app.api.analysis import router as analysis_router
 from app.api.reports import router as reports_router
 from app.services.monitor_service import MonitorService
 from app.services.changes_service import ChangesTrackingService
+from app.services.telegram_service import get_telegram_service
+from app.services.scraper_service import close_http_client
 from datetime import datetime
 import logging
 
@@ -39,10 +41,9 @@ async def scheduled_ai_analysis():
         logger.info(f"🤖 Запуск запланированного AI анализа в {current_time}")
 
         from app.services.analysis_service import AnalysisService
-        from app.services.telegram_service import TelegramService
 
         analysis_service = AnalysisService()
-        telegram_service = TelegramService()
+        telegram_service = get_telegram_service()
 
         # Полный анализ рынка для выявления лучших вариантов
         result = await analysis_service.analyze_full_database(min_cars_per_brand=3)
@@ -65,7 +66,7 @@ async def scheduled_ai_analysis():
         logger.error(f"❌ Ошибка scheduled AI анализа: {e}")
         # Отправляем уведомление об ошибке
         try:
-            telegram_service = TelegramService()
+            telegram_service = get_telegram_service()
             await telegram_service.send_error_notification(f"Scheduled AI анализ не удался: {str(e)}")
         except:
             pass
@@ -85,8 +86,7 @@ async def daily_changes_check():
         logger.error(f"❌ Ошибка ежедневной проверки изменений: {e}")
         # Отправляем уведомление об ошибке
         try:
-            from app.services.telegram_service import TelegramService
-            telegram_service = TelegramService()
+            telegram_service = get_telegram_service()
             await telegram_service.send_error_notification(f"Проверка изменений не удалась: {str(e)}")
         except:
             pass
@@ -120,6 +120,15 @@ async def lifespan(app: FastAPI):
     await init_db()
     logger.info("🗄️ База данных инициализирована")
 
+    # Один TelegramService на все приложение (scheduler, сервисы и API через Depends)
+    await get_telegram_service().start()
+
+    # Уведомления, не доставленные до прошлой остановки, ставим в очередь заново
+    try:
+        await monitor_service.resend_pending_notifications()
+    except Exception as e:
+        logger.error(f"❌ Не удалось восстановить очередь уведомлений: {e}")
+
     # 🔍 Schedule monitoring with random interval (5-10 min) and night pause
     scheduler.add_job(
         check_cars_with_night_pause,
@@ -171,7 +180,8 @@ async def lifespan(app: FastAPI):
 
     # Shutdown
     scheduler.shutdown()
-    await monitor_service.telegram.close()
+    await get_telegram_service().close()
+    close_http_client()
 
 
 app = FastAPI(
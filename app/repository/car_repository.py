@@ -3,8 +3,31 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_, desc, func, text
 from app.models.car import Car
 from app.schemas.car import CarCreate
-from typing import List, Optional, Dict, Any, Set
+from typing import List, Optional, Dict, Any, Set, FrozenSet
 from datetime import datetime, timedelta
+from functools import lru_cache
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+
+# Все, что не цифра (разделители тысяч, валюта, пробелы): "12,500 €" -> "12500"
+_NON_DIGIT_RE = re.compile(r"\D")
+
+
+@lru_cache(maxsize=4096)
+def extract_price_number(price_text: Optional[str]) -> Optional[int]:
+    """Извлекает число из текста цены ("12,500 €" -> 12500).
+
+    Одинаковые строки цен повторяются между объявлениями и проверками, поэтому результат кэшируется
+    """
+    if not price_text:
+        return None
+
+    # Оставляем только цифры (разделители тысяч и валюта отбрасываются сами)
+    digits = _NON_DIGIT_RE.sub("", price_text)
+    return int(digits) if digits else None
 
 
 class CarRepository:
@@ -17,13 +40,12 @@ class CarRepository:
         )
         return result.scalar_one_or_none()
 
-    async def get_existing_links_by_filter(self, filter_name: str) -> Set[str]:
-        """🎯 НОВЫЙ: Получает все существующие ссылки для фильтра"""
+    async def get_existing_links_by_filter(self, filter_name: str) -> FrozenSet[str]:
+        """🎯 НОВЫЙ: Получает все существующие ссылки для фильтра (один запрос)"""
         result = await self.session.execute(
             select(Car.link).where(Car.filter_name == filter_name)
         )
-        links = result.scalars().all()
-        return set(links)
+        return frozenset(result.scalars().all())
 
     async def get_all_existing_links(self) -> Set[str]:
         """Получает все существующие ссылки из базы"""
@@ -40,10 +62,11 @@ class CarRepository:
         await self.session.refresh(car)
         return car
 
-    async def get_unnotified_cars(self) -> List[Car]:
-        result = await self.session.execute(
-            select(Car).where(Car.is_notified == False)
-        )
+    async def get_unnotified_cars(self, since: Optional[datetime] = None) -> List[Car]:
+        query = select(Car).where(Car.is_notified == False)
+        if since is not None:
+            query = query.where(Car.created_at >= since).order_by(Car.created_at)
+        result = await self.session.execute(query)
         return result.scalars().all()
 
     async def mark_as_notified(self, car_id: int):
@@ -504,8 +527,8 @@ class CarRepository:
             if car.previous_price and car.price:
                 try:
                     # Извлекаем числовые значения цен
-                    old_price_num = self._extract_price_number(car.previous_price)
-                    new_price_num = self._extract_price_number(car.price)
+                    old_price_num = extract_price_number(car.previous_price)
+                    new_price_num = extract_price_number(car.price)
 
                     if old_price_num and new_price_num:
                         price_drop = old_price_num - new_price_num
@@ -515,18 +538,3 @@ class CarRepository:
                     continue
 
         return significant_drops
-
-    def _extract_price_number(self, price_text: str) -> Optional[int]:
-        """Извлекает число из текста цены"""
-        import re
-        if not price_text:
-            return None
-
-        # Убираем все кроме цифр
-        numbers = re.findall(r'\d+', price_text.replace(',', '').replace(' ', ''))
-        if numbers:
-            try:
-                return int(''.join(numbers))
-            except:
-                return None
-        return None
\ No newline at end of file
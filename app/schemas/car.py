@@ -1,6 +1,6 @@
 
 # app/schemas/car.py
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
 from typing import Optional
 
@@ -20,7 +20,9 @@ class CarBase(BaseModel):
 
 
 class CarCreate(CarBase):
-    pass
+    # Создается скрапером через model_construct (данные уже типизированы),
+    # после создания не меняется
+    model_config = ConfigDict(frozen=True, extra='forbid', validate_assignment=False)
 
 
 class CarResponse(CarBase):
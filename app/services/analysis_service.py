@@ -4,6 +4,7 @@ from app.services.openai_service import OpenAIService
 from app.repository.car_repository import CarRepository
 from app.database import async_session
 import logging
+import re
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
@@ -225,7 +226,6 @@ class AnalysisService:
                 quick_rec = await self.openai_service.get_quick_recommendation(cars)
 
                 # Ищем рекомендованную машину
-                import re
                 recommended_link = None
                 match = re.search(r"#(\d+)", quick_rec)
                 if match:
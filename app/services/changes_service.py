@@ -1,10 +1,11 @@
 # app/services/changes_service.py - отслеживание изменений в объявлениях
 from app.services.scraper_service import ScraperService
-from app.services.telegram_service import TelegramService
-from app.repository.car_repository import CarRepository
+from app.services.telegram_service import get_telegram_service
+from app.repository.car_repository import CarRepository, extract_price_number
 from app.database import async_session
 from app.models.car import Car
 from datetime import datetime, timedelta
+import asyncio
 import logging
 from typing import List, Dict, Any, Optional
 
@@ -14,7 +15,7 @@ logger = logging.getLogger(__name__)
 class ChangesTrackingService:
     def __init__(self):
         self.scraper = ScraperService()
-        self.telegram = TelegramService()
+        self.telegram = get_telegram_service()
 
     async def check_all_cars_for_changes(self):
         """🔄 Главный метод: проверка всех машин на изменения"""
@@ -54,8 +55,8 @@ class ChangesTrackingService:
                             if changes.get("description_changed"):
                                 description_changes += 1
 
-                            # Отправляем уведомление об изменениях
-                            await self.telegram.send_car_changes_notification(car, changes)
+                            # Уведомление об изменениях уходит в фоне - проверка следующих машин не ждет Telegram
+                            self.telegram.send_in_background(self.telegram.send_car_changes_notification(car, changes))
 
                         # Обновляем время последней проверки
                         await repo.update_last_checked(car.id)
@@ -69,7 +70,6 @@ class ChangesTrackingService:
                             logger.error(f"❌ Error checking car {car.id}: {e}")
 
                 # Пауза между батчами
-                import asyncio
                 await asyncio.sleep(2)
 
             # Отправляем общую сводку
@@ -105,6 +105,9 @@ class ChangesTrackingService:
                 changes["price_changed"] = True
                 changes["old_price"] = car.price
                 changes["new_price"] = current_price
+                # Числовые цены считаем здесь один раз - уведомление их не перепарсивает
+                changes["old_price_num"] = extract_price_number(car.price)
+                changes["new_price_num"] = extract_price_number(current_price)
 
                 # Обновляем в базе
                 await repo.update_price_change(car.id, car.price, current_price)
@@ -153,7 +156,7 @@ class ChangesTrackingService:
                     })
 
                     if changes:
-                        await self.telegram.send_car_changes_notification(car, changes)
+                        self.telegram.send_in_background(self.telegram.send_car_changes_notification(car, changes))
 
                 except Exception as e:
                     results.append({
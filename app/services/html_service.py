@@ -1,8 +1,9 @@
 # app/services/html_service.py - ПОЛНАЯ ИСПРАВЛЕННАЯ ВЕРСИЯ
 import os
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
+import heapq
 import logging
 import re
 
@@ -13,6 +14,9 @@ class HTMLReportService:
     def __init__(self):
         self.reports_dir = Path("reports")
         self.reports_dir.mkdir(exist_ok=True)
+        # Кэш списка отчетов: limit -> (mtime папки reports, список).
+        # mtime папки меняется при создании/удалении файла, так что кэш не устаревает
+        self._reports_list_cache: Dict[int, Tuple[int, List[Dict[str, Any]]]] = {}
 
     def generate_analysis_report(self, analysis_result: Dict[str, Any]) -> str:
         """Генерирует HTML отчет с AI анализом"""
@@ -600,14 +604,18 @@ class HTMLReportService:
         """Возвращает список последних отчетов"""
 
         try:
-            reports = []
+            dir_mtime = self.reports_dir.stat().st_mtime_ns
+            cached = self._reports_list_cache.get(limit)
+            if cached and cached[0] == dir_mtime:
+                return list(cached[1])
+
+            # stat() каждого файла один раз; полная сортировка не нужна - берем limit самых новых
+            files = []
+            for file_path in self.reports_dir.glob("*.html"):
+                files.append((file_path.stat(), file_path))
 
-            for file_path in sorted(
-                self.reports_dir.glob("*.html"),
-                key=lambda x: x.stat().st_mtime,
-                reverse=True,
-            )[:limit]:
-                stat = file_path.stat()
+            reports = []
+            for stat, file_path in heapq.nlargest(limit, files, key=lambda item: item[0].st_mtime):
                 reports.append(
                     {
                         "filename": file_path.name,
@@ -619,7 +627,8 @@ class HTMLReportService:
                     }
                 )
 
-            return reports
+            self._reports_list_cache[limit] = (dir_mtime, reports)
+            return list(reports)
 
         except Exception as e:
             logger.error(f"Ошибка получения списка отчетов: {e}")
@@ -645,3 +654,14 @@ class HTMLReportService:
         except Exception as e:
             logger.error(f"Ошибка очистки старых отчетов: {e}")
             return 0
+
+
+_html_service: Optional[HTMLReportService] = None
+
+
+def get_html_service() -> HTMLReportService:
+    """Возвращает общий HTMLReportService, создает его при первом обращении"""
+    global _html_service
+    if _html_service is None:
+        _html_service = HTMLReportService()
+    return _html_service
@@ -1,10 +1,12 @@
 # app/services/monitor_service.py - ИСПРАВЛЕН: убран AI urgent detection
 from app.services.scraper_service import ScraperService
-from app.services.telegram_service import TelegramService
+from app.services.telegram_service import get_telegram_service
 from app.services.analysis_service import AnalysisService
 from app.repository.car_repository import CarRepository
 from app.database import async_session
 from app.config import settings
+from app.models.car import Car
+from datetime import datetime, timedelta
 import logging
 from typing import Dict, List
 
@@ -14,7 +16,7 @@ logger = logging.getLogger(__name__)
 class MonitorService:
     def __init__(self):
         self.scraper = ScraperService()
-        self.telegram = TelegramService()
+        self.telegram = get_telegram_service()
         self.analysis = AnalysisService()
 
     async def _is_urgent(self, text: str) -> bool:
@@ -45,6 +47,35 @@ class MonitorService:
             logger.debug("✅ _is_urgent() - no urgent keywords found")
             return False
 
+    async def _mark_notified(self, car: Car):
+        """✅ Отмечает машину как отправленную - вызывается только после доставки в Telegram"""
+        async with async_session() as session:
+            await CarRepository(session).mark_as_notified(car.id)
+
+    async def resend_pending_notifications(self, hours: int = 24) -> int:
+        """📤 Повторно ставит в очередь уведомления, не доставленные до рестарта.
+
+        Очередь в памяти теряется при остановке, а is_notified в БД - нет
+        """
+        since = datetime.now() - timedelta(hours=hours)
+        async with async_session() as session:
+            cars = await CarRepository(session).get_unnotified_cars(since=since)
+
+        for car in cars:
+            filter_config = settings.car_filters.get(car.filter_name, {})
+            is_urgent_filter = filter_config.get("urgent_mode", False)
+            urgent = await self._is_urgent(car.description or "")
+            await self.telegram.enqueue_new_car_notification(
+                car,
+                urgent=urgent or is_urgent_filter,
+                urgent_filter=is_urgent_filter,
+                on_sent=self._mark_notified
+            )
+
+        if cars:
+            logger.info("📤 Повторно поставлено в очередь %d недоставленных уведомлений", len(cars))
+        return len(cars)
+
     async def _process_filter(self, filter_name: str, repo: CarRepository) -> int:
         """Скрапинг и обработка одного фильтра с оптимизацией"""
         logger.info(f"🎯 _process_filter() called for: {filter_name}")
@@ -80,15 +111,15 @@ class MonitorService:
                     logger.debug(f"🔍 _process_filter({filter_name}) - checking urgent status for car ID: {new_car.id}")
                     urgent = await self._is_urgent(new_car.description or "")
 
-                    # Отправляем уведомление
-                    logger.info(f"📱 _process_filter({filter_name}) - sending notification for car ID: {new_car.id}")
-                    await self.telegram.send_new_car_notification(
+                    # Ставим уведомление в очередь - отправка идет в фоне, скрапинг не ждет Telegram
+                    logger.info(f"📱 _process_filter({filter_name}) - queueing notification for car ID: {new_car.id}")
+                    await self.telegram.enqueue_new_car_notification(
                         new_car,
                         urgent=urgent or is_urgent_filter,
-                        urgent_filter=is_urgent_filter
+                        urgent_filter=is_urgent_filter,
+                        on_sent=self._mark_notified
                     )
 
-                    await repo.mark_as_notified(new_car.id)
                     new_cars_count += 1
                     logger.debug(f"✅ _process_filter({filter_name}) - car ID {new_car.id} processed successfully")
 
@@ -137,7 +168,7 @@ class MonitorService:
                 urgent_total = sum(urgent_filters_stats.values())
                 if urgent_total > 0:
                     logger.info(f"🔥 check_new_cars() - sending urgent summary: {urgent_total} total urgent cars")
-                    await self.telegram.send_urgent_summary(urgent_filters_stats)
+                    await self.telegram.enqueue_urgent_summary(urgent_filters_stats)
 
             # Затем обрабатываем обычные фильтры
             logger.info(f"📊 check_new_cars() - processing REGULAR filters: {regular_filters}")
@@ -187,7 +218,7 @@ class MonitorService:
 
         if total_urgent > 0:
             logger.info(f"🔥 run_urgent_check_only() - found {total_urgent} urgent cars")
-            await self.telegram.send_urgent_summary(urgent_found)
+            await self.telegram.enqueue_urgent_summary(urgent_found)
 
             # AI анализ для urgent (опционально)
             for filter_name, count in urgent_found.items():
@@ -9,6 +9,19 @@ import re
 
 logger = logging.getLogger(__name__)
 
+# Специальный формат в конце ответа: РЕКОМЕНДУЕМЫЕ_ID: [12, 25, 33]
+RECOMMENDED_IDS_RE = re.compile(r'РЕКОМЕНДУЕМЫЕ_ID:\s*\[([0-9,\s]+)\]')
+
+# Все старые форматы упоминания ID одной регуляркой - один проход по тексту
+CAR_ID_MENTION_RE = re.compile(
+    r'[①②③④⑤⑥⑦⑧⑨⑩] ID #?(\d+)'  # ① ID #10 или ① ID 10
+    r'|ID[:\s#]+(\d+)'  # ID: 123, ID #123, ID 123
+    r'|Автомобиль #(\d+)'
+    r'|машин[аы]\s+#?(\d+)'
+    r'|\(ID:\s*(\d+)\)',
+    re.IGNORECASE
+)
+
 
 class OpenAIService:
     def __init__(self):
@@ -217,52 +230,28 @@ class OpenAIService:
 
     def _extract_recommended_car_ids(self, recommendations: str, cars: List[Car]) -> List[int]:
         """ИСПРАВЛЕННОЕ извлечение ID рекомендованных машин"""
-        import re
-
         found_ids = set()
+        known_ids = {car.id for car in cars}
 
         # 1. Ищем специальный формат в конце: РЕКОМЕНДУЕМЫЕ_ID: [12, 25, 33]
-        special_pattern = r'РЕКОМЕНДУЕМЫЕ_ID:\s*\[([0-9,\s]+)\]'
-        special_match = re.search(special_pattern, recommendations)
+        special_match = RECOMMENDED_IDS_RE.search(recommendations)
 
         if special_match:
             ids_str = special_match.group(1)
             for id_str in ids_str.split(','):
                 try:
                     car_id = int(id_str.strip())
-                    if any(car.id == car_id for car in cars):
+                    if car_id in known_ids:
                         found_ids.add(car_id)
                 except ValueError:
                     continue
 
-        # 2. Если не найден специальный формат, ищем по старым паттернам
+        # 2. Если не найден специальный формат, ищем по старым паттернам (один проход)
         if not found_ids:
-            id_patterns = [
-                r'① ID #?(\d+)',  # ① ID #10 или ① ID 10
-                r'② ID #?(\d+)',  # ② ID #13
-                r'③ ID #?(\d+)',  # ③ ID #14
-                r'④ ID #?(\d+)',  # и так далее...
-                r'⑤ ID #?(\d+)',
-                r'⑥ ID #?(\d+)',
-                r'⑦ ID #?(\d+)',
-                r'⑧ ID #?(\d+)',
-                r'⑨ ID #?(\d+)',
-                r'⑩ ID #?(\d+)',
-                r'ID[:\s#]+(\d+)',  # ID: 123, ID #123, ID 123
-                r'Автомобиль #(\d+)',
-                r'машин[аы]\s+#?(\d+)',
-                r'\(ID:\s*(\d+)\)'
-            ]
-
-            for pattern in id_patterns:
-                matches = re.findall(pattern, recommendations, re.IGNORECASE)
-                for match in matches:
-                    try:
-                        car_id = int(match)
-                        if any(car.id == car_id for car in cars):
-                            found_ids.add(car_id)
-                    except ValueError:
-                        continue
+            for match in CAR_ID_MENTION_RE.finditer(recommendations):
+                car_id = int(next(group for group in match.groups() if group))
+                if car_id in known_ids:
+                    found_ids.add(car_id)
 
         logger.info(f"Извлечено рекомендованных ID: {sorted(list(found_ids))}")
         return sorted(list(found_ids))
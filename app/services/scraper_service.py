@@ -8,8 +8,11 @@ from selenium.webdriver.support import expected_conditions as EC
 from bs4 import BeautifulSoup
 import re
 import asyncio
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Optional, Set, Any
+from typing import List, Dict, Optional, FrozenSet, Any
 from app.config import settings
 from app.schemas.car import CarCreate
 import httpx
@@ -17,6 +20,101 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+BASE_URL = "https://www.bazaraki.com"
+
+# Потоки для догрузки описаний объявлений по HTTP. Пул только ждет сеть: BeautifulSoup
+# держит GIL, поэтому сами объявления со страницы списка разбираются в одном потоке
+DESCRIPTION_FETCH_WORKERS = 8
+
+# Ключевые слова срочной продажи - одна скомпилированная регулярка вместо
+# проверки каждой подстроки по отдельности
+URGENT_KEYWORDS_RE = re.compile('|'.join(map(re.escape, [
+    'срочно', 'urgent', 'быстро', 'asap', 'must sell', 'price drop',
+    'reduced', 'negotiable', 'open to offers', 'торг', 'обмен',
+    'выгодно', 'недорого', 'дешево', 'снижена цена', 'уместен торг'
+])), re.IGNORECASE)
+
+# Признаки удаленного объявления
+REMOVED_AD_RE = re.compile('|'.join(map(re.escape, [
+    "объявление удалено",
+    "ad has been removed",
+    "404",
+    "не найдено",
+    "not found",
+    "page not found"
+])), re.IGNORECASE)
+
+# Селекторы полей страницы объявления (в порядке приоритета)
+PRICE_SELECTORS = (
+    ".announcement-price__cost",
+    ".price-section .price",
+    ".announcement-block .price",
+    "[data-testid='price']",
+    ".price-block .price",
+    ".cost-primary",
+)
+DESCRIPTION_SELECTORS = (
+    ".js-description",
+    ".announcement-description",
+    ".description-text",
+    "[data-testid='description']",
+    ".announcement-block .description",
+    ".ad-description",
+)
+TITLE_SELECTORS = (
+    ".announcement-title",
+    ".page-title h1",
+    ".ad-title",
+    "h1.title",
+    "[data-testid='title']",
+)
+# Обязательные поля - цена и заголовок: если какого-то нет во фрагменте, разбираем всю страницу.
+# Описания у объявления может не быть вовсе - из-за него страницу заново не забираем
+REQUIRED_FIELD_SELECTORS = tuple(
+    ", ".join(group) for group in (PRICE_SELECTORS, TITLE_SELECTORS)
+)
+
+# Забираем из браузера только нужные фрагменты страницы объявления
+# вместо сериализации всего DOM через driver.page_source
+PAGE_FRAGMENTS_JS = """
+const root = document.querySelector('.announcement-block')
+    || document.querySelector('.page-content')
+    || document.body;
+return {
+    html: root ? root.outerHTML : '',
+    title: document.title || '',
+    text: document.body ? document.body.innerText : ''
+};
+"""
+
+# Один HTTP клиент на процесс: keep-alive + HTTP/2, без TLS handshake на каждое описание.
+# ScraperService создается и в API-хендлерах, поэтому клиент не хранится в экземпляре
+_http_client: Optional[httpx.Client] = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """Возвращает общий HTTP клиент, создает его при первом обращении (потокобезопасно)"""
+    global _http_client
+    if _http_client is None:
+        with _http_client_lock:
+            if _http_client is None:
+                _http_client = httpx.Client(
+                    http2=True,
+                    timeout=10.0,
+                    limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+                    headers={"User-Agent": "Mozilla/5.0"}
+                )
+    return _http_client
+
+
+def close_http_client():
+    """Закрывает общий HTTP клиент (вызывается при остановке приложения)"""
+    global _http_client
+    if _http_client is not None:
+        _http_client.close()
+        _http_client = None
+
 
 class ScraperService:
     def __init__(self):
@@ -25,19 +123,25 @@ class ScraperService:
         self.options.add_argument('--disable-gpu')
         self.options.add_argument('--no-sandbox')
         self.options.add_argument('--disable-dev-shm-usage')
+        self.options.add_argument(
+            '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
+        self.options.add_argument('--accept-language=en-US,en;q=0.9')
+        self.options.add_argument('--disable-blink-features=AutomationControlled')
+        # Не ждем загрузки картинок/стилей - driver.get() возвращается после DOMContentLoaded,
+        # нужные элементы дожидаемся через WebDriverWait
+        self.options.page_load_strategy = 'eager'
 
     def _fetch_description(self, link: str) -> Optional[str]:
-        """Загружает страницу объявления и извлекает описание"""
+        """Загружает страницу объявления и извлекает описание (вызывается из пула потоков)"""
         try:
-            with httpx.Client(timeout=10.0) as client:
-                resp = client.get(link)
-                if resp.status_code != 200:
-                    return None
-                soup = BeautifulSoup(resp.text, 'html.parser')
-                desc_div = soup.find('div', class_='js-description')
-                if desc_div:
-                    paragraphs = [p.get_text(' ', strip=True) for p in desc_div.find_all('p')]
-                    return ' '.join(paragraphs)
+            resp = get_http_client().get(link)
+            if resp.status_code != 200:
+                return None
+            soup = BeautifulSoup(resp.text, 'html.parser')
+            desc_div = soup.find('div', class_='js-description')
+            if desc_div:
+                paragraphs = [p.get_text(' ', strip=True) for p in desc_div.find_all('p')]
+                return ' '.join(paragraphs)
         except Exception:
             return None
         return None
@@ -45,10 +149,6 @@ class ScraperService:
     def _create_driver(self) -> webdriver.Chrome:
         """Create Chrome driver using path from settings"""
         service = Service(executable_path=settings.chromedriver_path)
-        self.options.add_argument(
-            '--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36')
-        self.options.add_argument('--accept-language=en-US,en;q=0.9')
-        self.options.add_argument('--disable-blink-features=AutomationControlled')
         return webdriver.Chrome(service=service, options=self.options)
 
     def _has_urgent_keywords(self, text: str) -> bool:
@@ -56,42 +156,38 @@ class ScraperService:
         if not text:
             return False
 
-        urgent_keywords = [
-            'срочно', 'urgent', 'быстро', 'asap', 'must sell', 'price drop',
-            'reduced', 'negotiable', 'open to offers', 'торг', 'обмен',
-            'выгодно', 'недорого', 'дешево', 'снижена цена', 'уместен торг'
-        ]
-
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in urgent_keywords)
+        return URGENT_KEYWORDS_RE.search(text) is not None
 
-    def _should_skip_ad(self, ad, existing_links: Set[str]) -> tuple[bool, str]:
+    def _should_skip_ad(self, ad, existing_links: FrozenSet[str]) -> tuple[bool, str]:
         """🎯 Проверяет, нужно ли пропустить объявление"""
         title_tag = ad.find("a", class_="advert__content-title")
         if not title_tag:
             return True, "no_title_tag"
 
-        link = "https://www.bazaraki.com" + title_tag.get('href', '')
-
-        if link in existing_links:
+        if BASE_URL + title_tag.get('href', '') in existing_links:
             return True, "already_exists"
 
         return False, ""
 
-    def _parse_car_data(self, ad, filter_config: Dict, existing_links: Set[str]) -> Optional[CarCreate]:
-        """Парсит данные автомобиля с проверкой существования"""
+    def _inline_description(self, ad) -> Optional[str]:
+        """Описание из карточки объявления в списке (если сайт его показал)"""
+        desc_tag = ad.find("div", class_="advert__description")
+        if not desc_tag:
+            desc_tag = ad.find("div", class_="advert__content-description")
+        return desc_tag.text.strip() if desc_tag else None
 
-        # Сначала быстрая проверка - есть ли уже в базе
-        should_skip, reason = self._should_skip_ad(ad, existing_links)
-        if should_skip:
-            if reason == "already_exists":
-                logger.debug("⏭️ Пропускаем существующее объявление")
-            return None
+    def _parse_car_data(self, ad, filter_config: Dict,
+                        description: Optional[str]) -> tuple[Optional[CarCreate], str]:
+        """Парсит данные автомобиля (объявление уже проверено через _should_skip_ad)
+
+        description - описание из карточки или уже загруженное со страницы объявления.
+        Возвращает (машина, "") или (None, причина пропуска): "filtered_year", "filtered_mileage".
+        """
 
-        # Title и link (уже проверили в _should_skip_ad)
+        # Title и link (объявление уже прошло _should_skip_ad в _scrape_cars_sync)
         title_tag = ad.find("a", class_="advert__content-title")
         title = title_tag.text.strip()
-        link = "https://www.bazaraki.com" + title_tag.get('href', '')
+        link = BASE_URL + title_tag.get('href', '')
 
         # Price
         price_tag = ad.find("a", class_="advert__content-price")
@@ -147,14 +243,6 @@ class ScraperService:
             if place_tag:
                 place = place_tag.text.strip()
 
-        # Description (загружается отдельно - только для новых объявлений!)
-        desc_tag = ad.find("div", class_="advert__description")
-        if not desc_tag:
-            desc_tag = ad.find("div", class_="advert__content-description")
-        description = desc_tag.text.strip() if desc_tag else None
-        if not description:
-            description = self._fetch_description(link)
-
         # 🔥 URGENT MODE LOGIC - более мягкие фильтры
         is_urgent_mode = filter_config.get("urgent_mode", False)
 
@@ -165,26 +253,27 @@ class ScraperService:
             # Более мягкие ограничения для urgent
             if year and year < filter_config.get("min_year", 0):
                 if year < (filter_config.get("min_year", 0) - 2):
-                    return None
+                    return None, "filtered_year"
 
             if mileage and mileage > filter_config.get("max_mileage", float('inf')):
                 max_allowed = filter_config.get("max_mileage", float('inf'))
                 if has_urgent_text:
                     max_allowed += 50000  # Бонус для urgent объявлений
                 if mileage > max_allowed:
-                    return None
+                    return None, "filtered_mileage"
 
             logger.info(f"🔥 Urgent режим: {filter_config.get('filter_name')} - найдена машина"
                         f" {'(URGENT keywords!)' if has_urgent_text else ''}")
         else:
             # Обычная логика фильтрации
             if year and year < filter_config.get("min_year", 0):
-                return None
+                return None, "filtered_year"
 
             if mileage and mileage > filter_config.get("max_mileage", float('inf')):
-                return None
+                return None, "filtered_mileage"
 
-        return CarCreate(
+        # Поля уже приведены к нужным типам выше - пропускаем валидацию pydantic
+        car = CarCreate.model_construct(
             title=title,
             link=link,
             price=price,
@@ -197,8 +286,9 @@ class ScraperService:
             place=place,
             filter_name=filter_config.get("filter_name", "unknown")
         )
+        return car, ""
 
-    def _scrape_cars_sync(self, filter_config: Dict, existing_links: Set[str]) -> List[CarCreate]:
+    def _scrape_cars_sync(self, filter_config: Dict, existing_links: FrozenSet[str]) -> List[CarCreate]:
         """Synchronous scraping с оптимизацией по existing_links"""
         is_urgent = filter_config.get("urgent_mode", False)
         filter_name = filter_config.get("filter_name", "unknown")
@@ -218,66 +308,99 @@ class ScraperService:
 
             html = driver.page_source
             soup = BeautifulSoup(html, "html.parser")
-            debug_file = f"/app/debug_{filter_name}.html"
-            with open(debug_file, 'w', encoding='utf-8') as f:
-                f.write(html)
-            logger.info(f"🐛 DEBUG: HTML сохранен в {debug_file}")
-            # 🐛 ПРОСТОЙ ДЕБАГ
-            filter_name = filter_config.get("filter_name", "unknown")
-            logger.info(f"🐛 DEBUG {filter_name}: HTML размер={len(html)} символов")
-            logger.info(f"🐛 DEBUG {filter_name}: div элементов всего={len(soup.find_all('div'))}")
-
-            # Проверяем разные селекторы для объявлений:
-            selectors = [
-                ("div.advert.js-item-listing", "advert js-item-listing"),
-                ("div.advert", "advert"),
-                ("[class*='advert']", None),
-                (".announcement-item", "announcement-item"),
-            ]
-
-            for selector, class_name in selectors:
-                if class_name:
-                    found = soup.find_all("div", class_=class_name)
-                else:
-                    found = soup.select(selector)
-                logger.info(f"🐛 DEBUG {filter_name}: '{selector}' найдено {len(found)} элементов")
-
-            # Проверяем ссылки на авто:
-            all_links = soup.find_all('a', href=True)
-            car_links = [a for a in all_links if 'bazaraki.com/adv/' in a.get('href', '')]
-            logger.info(f"🐛 DEBUG {filter_name}: всего ссылок={len(all_links)}, на авто={len(car_links)}")
-
-            # Проверяем заголовок страницы:
-            title = soup.find('title')
-            page_title = title.text[:100] if title else "нет заголовка"
-            logger.info(f"🐛 DEBUG {filter_name}: заголовок='{page_title}'")
+            # 🐛 Дебаг страницы - только при включенном DEBUG логировании
+            if logger.isEnabledFor(logging.DEBUG):
+                self._debug_page_content(soup, html, filter_name)
 
             ads = soup.select("div.advert.js-item-listing")
             logger.info(f"📄 Найдено {len(ads)} объявлений на странице для {filter_name}")
 
-            cars = []
-            skipped_existing = 0
+            # Причины пропуска объявлений: already_exists, no_title_tag, filtered_year, filtered_mileage
+            skip_reasons = Counter()
 
+            # Сразу отбрасываем известные объявления и объявления без заголовка -
+            # для них не нужен полный разбор объявления
+            new_ads = []
             for ad in ads:
-                car_data = self._parse_car_data(ad, filter_config, existing_links)
+                should_skip, reason = self._should_skip_ad(ad, existing_links)
+                if should_skip:
+                    skip_reasons[reason] += 1
+                else:
+                    new_ads.append(ad)
+            ads = new_ads
+
+            # Description (загружается отдельно - только для новых объявлений!)
+            # Недостающие описания качаем параллельно - потоки только ждут ответа сайта
+            links = [BASE_URL + ad.find("a", class_="advert__content-title").get('href', '') for ad in ads]
+            descriptions = [self._inline_description(ad) for ad in ads]
+            links_to_fetch = [link for link, description in zip(links, descriptions) if not description]
+            fetched = {}
+            if links_to_fetch:
+                with ThreadPoolExecutor(max_workers=DESCRIPTION_FETCH_WORKERS) as executor:
+                    fetched = dict(zip(links_to_fetch, executor.map(self._fetch_description, links_to_fetch)))
+                loaded = sum(1 for description in fetched.values() if description)
+                logger.info(f"📝 Догружено описаний: {loaded} из {len(links_to_fetch)} для {filter_name}")
+
+            # Разбор объявлений - в этом потоке: это чистый CPU, потоки тут не помогают
+            parsed = []
+            for ad, link, description in zip(ads, links, descriptions):
+                parsed.append(self._parse_car_data(ad, filter_config, description or fetched.get(link)))
+
+            cars = []
+            for car_data, reason in parsed:
                 if car_data:
                     cars.append(car_data)
                 else:
-                    # Проверяем причину пропуска
-                    should_skip, reason = self._should_skip_ad(ad, existing_links)
-                    if reason == "already_exists":
-                        skipped_existing += 1
+                    skip_reasons[reason] += 1
 
+            skipped_existing = skip_reasons["already_exists"]
             logger.info(f"✅ Отфильтровано: {len(cars)} НОВЫХ машин для {filter_name}")
             logger.info(f"⏭️ Пропущено существующих: {skipped_existing}")
             logger.info(f"📊 Соотношение: {len(cars)} новых / {skipped_existing} существующих")
+            if skip_reasons:
+                logger.info(f"🚫 Причины пропуска для {filter_name}: "
+                            f"{', '.join(f'{reason}={count}' for reason, count in skip_reasons.most_common())}")
 
             return cars
 
         finally:
             driver.quit()
 
-    async def scrape_cars(self, filter_name: str, existing_links: Set[str] = None) -> List[CarCreate]:
+    def _debug_page_content(self, soup: BeautifulSoup, html: str, filter_name: str):
+        """🐛 Дебаг содержимого страницы со списком объявлений"""
+        debug_file = f"/app/debug_{filter_name}.html"
+        try:
+            with open(debug_file, 'w', encoding='utf-8') as f:
+                f.write(html)
+            logger.debug(f"🐛 DEBUG: HTML сохранен в {debug_file}")
+        except OSError as e:
+            logger.debug(f"🐛 DEBUG: не удалось сохранить HTML в {debug_file}: {e}")
+
+        logger.debug(f"🐛 DEBUG {filter_name}: HTML размер={len(html)} символов")
+        logger.debug(f"🐛 DEBUG {filter_name}: div элементов всего={len(soup.find_all('div'))}")
+
+        # Проверяем разные селекторы для объявлений
+        selectors = [
+            "div.advert.js-item-listing",
+            "div.advert",
+            "[class*='advert']",
+            ".announcement-item",
+        ]
+        for selector in selectors:
+            found = soup.select(selector)
+            logger.debug(f"🐛 DEBUG {filter_name}: '{selector}' найдено {len(found)} элементов")
+
+        # Проверяем ссылки на авто
+        all_links = soup.find_all('a', href=True)
+        car_links = [a for a in all_links if 'bazaraki.com/adv/' in a.get('href', '')]
+        logger.debug(f"🐛 DEBUG {filter_name}: всего ссылок={len(all_links)}, на авто={len(car_links)}")
+
+        # Проверяем заголовок страницы
+        title = soup.find('title')
+        page_title = title.text[:100] if title else "нет заголовка"
+        logger.debug(f"🐛 DEBUG {filter_name}: заголовок='{page_title}'")
+
+    async def scrape_cars(self, filter_name: str, existing_links: Optional[FrozenSet[str]] = None) -> List[CarCreate]:
         """🎯 ОПТИМИЗИРОВАННЫЙ async метод с передачей existing_links"""
         filter_config = settings.car_filters.get(filter_name)
         if not filter_config:
@@ -288,7 +411,7 @@ class ScraperService:
 
         # Если existing_links не передан, создаем пустой set
         if existing_links is None:
-            existing_links = set()
+            existing_links = frozenset()
             logger.warning(f"⚠️ existing_links не передан для {filter_name}, парсим все объявления")
 
         loop = asyncio.get_running_loop()
@@ -324,14 +447,22 @@ class ScraperService:
                 except:
                     logger.warning(f"⚠️ Page structure might have changed for: {car_url}")
 
-            html = driver.page_source
-            soup = BeautifulSoup(html, "html.parser")
+            fragments = driver.execute_script(PAGE_FRAGMENTS_JS) or {}
+            page_text = fragments.get("text", "")
+            page_title = fragments.get("title", "")
 
             # Проверяем что страница не показывает "объявление удалено"
-            if self._is_ad_removed(soup):
+            if self._is_ad_removed(page_text):
                 logger.info(f"❌ Ad removed/unavailable: {car_url}")
                 return None
 
+            # BeautifulSoup разбирает только основной блок объявления
+            soup = BeautifulSoup(fragments.get("html", ""), "html.parser")
+            # Цена или заголовок могут лежать вне основного блока - тогда берем всю страницу
+            if not all(soup.select_one(selector) for selector in REQUIRED_FIELD_SELECTORS):
+                logger.debug(f"🔍 Price or title not found in page fragment, parsing full page: {car_url}")
+                soup = BeautifulSoup(driver.page_source, "html.parser")
+
             # Извлекаем цену
             price = self._extract_price_from_page(soup)
 
@@ -339,7 +470,7 @@ class ScraperService:
             description = self._extract_description_from_page(soup)
 
             # Дополнительные данные для полноты
-            title = self._extract_title_from_page(soup)
+            title = self._extract_title_from_page(soup, page_title)
 
             result = {
                 "price": price,
@@ -358,34 +489,14 @@ class ScraperService:
         finally:
             driver.quit()
 
-    def _is_ad_removed(self, soup: BeautifulSoup) -> bool:
-        """Проверяет удалено ли объявление"""
-        # Ищем признаки удаленного объявления
-        removed_indicators = [
-            "объявление удалено",
-            "ad has been removed",
-            "404",
-            "не найдено",
-            "not found",
-            "page not found"
-        ]
-
-        page_text = soup.get_text().lower()
-        return any(indicator in page_text for indicator in removed_indicators)
+    def _is_ad_removed(self, page_text: str) -> bool:
+        """Проверяет удалено ли объявление (по видимому тексту страницы)"""
+        return REMOVED_AD_RE.search(page_text) is not None
 
     def _extract_price_from_page(self, soup: BeautifulSoup) -> str:
         """Извлекает цену со страницы объявления"""
         # Пробуем разные селекторы для цены
-        price_selectors = [
-            ".announcement-price__cost",
-            ".price-section .price",
-            ".announcement-block .price",
-            "[data-testid='price']",
-            ".price-block .price",
-            ".cost-primary"
-        ]
-
-        for selector in price_selectors:
+        for selector in PRICE_SELECTORS:
             price_element = soup.select_one(selector)
             if price_element:
                 price_text = price_element.get_text(strip=True)
@@ -393,30 +504,26 @@ class ScraperService:
                     logger.debug(f"💰 Price found with selector '{selector}': {price_text}")
                     return price_text
 
-        # Fallback: ищем текст содержащий € и цифры
-        for element in soup.find_all(text=True):
-            if '€' in element and any(c.isdigit() for c in element):
-                price_text = element.strip()
-                if len(price_text) < 50:  # Разумная длина для цены
-                    logger.debug(f"💰 Price found via fallback: {price_text}")
-                    return price_text
+        # Fallback: первый короткий текст содержащий € и цифры
+        # (find останавливается на первом совпадении, без списка всех текстовых узлов)
+        element = soup.find(string=self._is_price_text)
+        if element:
+            price_text = element.strip()
+            logger.debug(f"💰 Price found via fallback: {price_text}")
+            return price_text
 
         logger.warning("💰 Price not found on page")
         return ""
 
+    @staticmethod
+    def _is_price_text(text: Optional[str]) -> bool:
+        """Текстовый узел похож на цену: есть € и цифры, разумная длина"""
+        return bool(text) and '€' in text and len(text.strip()) < 50 and any(c.isdigit() for c in text)
+
     def _extract_description_from_page(self, soup: BeautifulSoup) -> str:
         """Извлекает описание со страницы объявления"""
         # Пробуем разные селекторы для описания
-        description_selectors = [
-            ".js-description",
-            ".announcement-description",
-            ".description-text",
-            "[data-testid='description']",
-            ".announcement-block .description",
-            ".ad-description"
-        ]
-
-        for selector in description_selectors:
+        for selector in DESCRIPTION_SELECTORS:
             desc_element = soup.select_one(selector)
             if desc_element:
                 # Собираем текст из всех параграфов
@@ -433,18 +540,10 @@ class ScraperService:
         logger.warning("📝 Description not found on page")
         return ""
 
-    def _extract_title_from_page(self, soup: BeautifulSoup) -> str:
+    def _extract_title_from_page(self, soup: BeautifulSoup, page_title: str = "") -> str:
         """Извлекает заголовок объявления"""
         # Пробуем разные селекторы для заголовка
-        title_selectors = [
-            ".announcement-title",
-            ".page-title h1",
-            ".ad-title",
-            "h1.title",
-            "[data-testid='title']"
-        ]
-
-        for selector in title_selectors:
+        for selector in TITLE_SELECTORS:
             title_element = soup.select_one(selector)
             if title_element:
                 title_text = title_element.get_text(strip=True)
@@ -452,10 +551,9 @@ class ScraperService:
                     logger.debug(f"🏷️ Title found: {title_text[:50]}")
                     return title_text
 
-        # Fallback: title из <title> тега
-        title_tag = soup.find('title')
-        if title_tag:
-            title_text = title_tag.get_text(strip=True)
+        # Fallback: title из <title> тега (document.title)
+        if page_title:
+            title_text = page_title.strip()
             # Убираем лишние части типа "| Bazaraki"
             if '|' in title_text:
                 title_text = title_text.split('|')[0].strip()
@@ -491,54 +589,3 @@ class ScraperService:
         except:
             pass
         return "неизвестно"
-
-
-def _debug_page_content(self, soup: BeautifulSoup, filter_name: str):
-    """🐛 Дебаг содержимого страницы"""
-    logger.info(f"🐛 DEBUG {filter_name} - анализ страницы:")
-
-    # Проверяем основные контейнеры
-    all_divs = soup.find_all("div")
-    logger.info(f"📄 Всего div элементов: {len(all_divs)}")
-
-    # Ищем объявления по разным селекторам
-    selectors_to_try = [
-        "div.advert.js-item-listing",  # Текущий
-        "div.advert",  # Упрощенный
-        "div[class*='advert']",  # Любой с advert в классе
-        "div[class*='item']",  # Любой с item в классе
-        "div[class*='listing']",  # Любой с listing в классе
-        ".announcement-item",  # Альтернативный
-        ".ad-item",  # Еще альтернативный
-        "[data-testid*='ad']",  # По data-testid
-    ]
-
-    for selector in selectors_to_try:
-        found = soup.select(selector)
-        logger.info(f"🔍 '{selector}': найдено {len(found)} элементов")
-
-        if len(found) > 0 and len(found) <= 5:
-            # Показываем структуру первых элементов
-            for i, elem in enumerate(found[:2]):
-                classes = elem.get('class', [])
-                logger.info(f"  Элемент {i + 1}: классы={classes}")
-
-    # Проверяем есть ли ссылки на машины
-    car_links = soup.find_all("a", href=True)
-    bazaraki_links = [a for a in car_links if "bazaraki.com/adv/" in a.get('href', '')]
-    logger.info(f"🔗 Ссылок на объявления: {len(bazaraki_links)}")
-
-    # Проверяем заголовок страницы
-    title = soup.find("title")
-    page_title = title.text if title else "Нет заголовка"
-    logger.info(f"📄 Заголовок страницы: {page_title}")
-
-    # Проверяем есть ли ошибки на странице
-    error_indicators = [
-        "404", "not found", "page not found",
-        "error", "ошибка", "нет результатов", "no results"
-    ]
-    page_text = soup.get_text().lower()
-    for indicator in error_indicators:
-        if indicator in page_text:
-            logger.warning(f"⚠️ Найден индикатор проблемы: '{indicator}'")
\ No newline at end of file
@@ -1,42 +1,433 @@
 # app/services/telegram_service.py - С SCHEDULED АНАЛИЗОМ
 from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
 from aiogram.enums import ParseMode
-from aiogram.exceptions import TelegramAPIError
-from aiogram.types import FSInputFile
+from aiogram.exceptions import TelegramAPIError, TelegramNetworkError, TelegramRetryAfter, TelegramServerError
+from aiogram.types import BufferedInputFile, FSInputFile, InputFile
 from app.config import settings
 from app.models.car import Car
-from app.services.html_service import HTMLReportService
-from typing import Dict, Any, List, Optional
+from app.repository.car_repository import extract_price_number
+from app.services.html_service import get_html_service
+from aiolimiter import AsyncLimiter
+import aiofiles
+import aiofiles.os
+import orjson
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
 from datetime import datetime
+from html import escape as _esc
+from functools import lru_cache
+from itertools import islice
+import asyncio
 import logging
 import os
+import random
+import re
+import time
 
 logger = logging.getLogger(__name__)
 
+# Лимиты Telegram: ~30 сообщений/сек глобально и ~1 сообщение/сек в один чат.
+# Все уведомления уходят в один чат, поэтому лимитеры общие для всех экземпляров сервиса
+_overall_limiter = AsyncLimiter(30, 1)
+_per_chat_limiter = AsyncLimiter(1, 1)
+# До какого момента (loop.time()) Telegram просил не отправлять после 429.
+# Пауза общая: пока один вызов ждет retry_after, остальные тоже не идут в API и не ловят новые 429
+_flood_wait_until = 0.0
+
+# Circuit breaker: после BREAKER_THRESHOLD подряд неудачных вызовов (сеть, 5xx, 429 после всех попыток)
+# Telegram считаем недоступным и какое-то время не ходим в API вовсе - скрапинг и анализ не ждут ретраев
+BREAKER_THRESHOLD = 5
+BREAKER_MAX_OPEN_SECONDS = 60
+_breaker_failures = 0
+_breaker_open_until = 0.0  # time.monotonic()
+
+# Безопасный лимит длины сообщения для Telegram (жесткий лимит API - 4096)
+MAX_MESSAGE_LENGTH = 4000
+# Отчеты больше этого размера отправляем потоком (чанками), не читая целиком в память
+REPORT_STREAM_THRESHOLD = 256 * 1024
+# Лимит подписи к документу в Telegram
+MAX_CAPTION_LENGTH = 1024
+# Сколько ID рекомендованных машин показываем в выжимке
+MAX_SUMMARY_IDS = 8
+
+# Шаблон уведомления о новой машине: литерал собирается один раз при импорте,
+# на каждую машину остается только подстановка значений
+_format_car_message_text = (
+    "{header}🚗 <b>Новое объявление - {brand}</b>{filter_suffix}\n"
+    "\n"
+    "📝 <b>Заголовок:</b> {title}\n"
+    "💰 <b>Цена:</b> {price}\n"
+    "📅 <b>Год:</b> {year}\n"
+    "🛣 <b>Пробег:</b> {mileage}\n"
+    "📍 <b>Место:</b> {place}\n"
+    "📆 <b>Дата публикации:</b> {date_posted}\n"
+    "\n"
+    "🔗 <a href=\"{link}\">Посмотреть объявление</a>\n"
+    "\n"
+    "⚙️ <b>Характеристики:</b> {features}\n"
+    "\n"
+    "📝 <b>Описание:</b> {description}"
+).format
+
+# Шапка краткой выжимки AI анализа (_create_analysis_summary)
+_format_summary_header = (
+    "{urgent_emoji}🤖 <b>{urgent_text}AI АНАЛИЗ ЗАВЕРШЕН</b>\n"
+    "\n"
+    "📊 <b>Фильтр:</b> {filter} {urgent_suffix}\n"
+    "🚗 <b>Проанализировано:</b> {total} машин\n"
+    "⭐ <b>Рекомендовано:</b> {recommended} машин\n"
+    "🧠 <b>Модель:</b> {model}\n"
+    "\n"
+).format
+
+# Уведомление о быстром анализе (send_quick_analysis_notification)
+_format_quick_analysis = (
+    "{urgent_emoji}<b>{urgent_text}Быстрый AI анализ</b>\n"
+    "\n"
+    "🎯 <b>Фильтр:</b> {filter} {urgent_suffix}\n"
+    "📊 <b>Машин:</b> {total}\n"
+    "\n"
+    "🤖 <b>Рекомендация:</b>\n"
+    "{recommendation}\n"
+    "{link}"
+    "\n"
+    "\n"
+    "💡 <i>Для детального анализа используйте /analysis</i>\n"
+).format
+
+# Уведомление о топовых предложениях (send_top_deals_notification): шапка, строка машины, подвал
+_format_top_deals_header = (
+    "💎 <b>ТОП ПРЕДЛОЖЕНИЯ ДНЯ</b>\n"
+    "\n"
+    "🎯 <b>Найдено {count} лучших вариантов:</b>\n"
+    "\n"
+).format
+_format_top_deal_row = (
+    "<b>{i}. {brand} {year}</b>\n"
+    "📝 {title}\n"
+    "💰 {price} • 🛣 {mileage}\n"
+    "{indicators}\n"
+    "🔗 <a href=\"{link}\">Посмотреть</a>\n"
+    "\n"
+).format
+_TOP_DEALS_FOOTER = (
+    "\n"
+    "🤖 <i>Анализ основан на соотношении цена/качество, состоянии и описании</i>\n"
+    "⏰ <i>Обновляется 2 раза в день</i>\n"
+)
+
+# Описание изменения цены (_analyze_price_change), индекс = направление * 2 + (0 если > 10%, иначе 1)
+_PRICE_CHANGE_TEMPLATES = (
+    "📈 Значительное повышение (+{d:,}€, +{p:.1f}%)".format,
+    "📈 Повышение (+{d:,}€, +{p:.1f}%)".format,
+    "📉 Значительное снижение ({d:,}€, {p:.1f}%) 🎯".format,
+    "📉 Снижение ({d:,}€, {p:.1f}%)".format,
+)
+_PRICE_UNCHANGED = "🔄 Цена не изменилась (возможно, формат)"
+
+# Индикаторы хорошего предложения: (паттерн по описанию в нижнем регистре, метка).
+# Каждая группа слов - одна альтернатива, описание сканируется один раз на группу
+_DEAL_INDICATORS = tuple(
+    (re.compile("|".join(map(re.escape, words))), label)
+    for words, label in (
+        (("срочно", "urgent", "переезд", "быстро"), "🔥 срочно"),
+        (("отличное", "идеальное", "perfect", "excellent"), "✨ отличное состояние"),
+        (("сервис", "то", "обслуживание", "service"), "🔧 сервисная история"),
+        (("один владелец", "one owner", "первый"), "👤 один владелец"),
+        (("снижена", "скидка", "reduced", "discount"), "💸 снижена цена"),
+    )
+)
+
+
+# Предложение выводов - все до следующей точки (переносы строк внутри заменяются пробелом)
+_SENTENCE_RE = re.compile(r"[^.]+")
+# Непустая строка текста - для ленивого обхода строк без splitlines()
+_LINE_RE = re.compile(r"[^\r\n]+")
+
+
+def _orjson_dumps(value: Any) -> str:
+    """json_dumps для aiogram: orjson отдает bytes, сессии нужна строка"""
+    return orjson.dumps(value).decode()
+
+
+def _tg_len(text: str) -> int:
+    """Длина текста так, как ее считает Telegram - в UTF-16 code units (эмодзи = 2)"""
+    return len(text.encode("utf-16-le")) >> 1
+
+
+def _ellipsize(text: str, limit: int) -> str:
+    """Обрезает текст до limit символов с многоточием (один символ '…' вместо трех точек)"""
+    return text if len(text) <= limit else text[:limit] + "…"
+
+
+@lru_cache(maxsize=128)
+def _display_filter(name: str) -> str:
+    """Название фильтра для HTML сообщений: 'Title Case' + экранирование.
+
+    Фильтров немного, поэтому результат кэшируется и не пересчитывается в каждом сообщении
+    """
+    return _esc(name.title())
+
+
+def _pause_sends(seconds: float):
+    """Приостанавливает все отправки в Telegram на seconds (после 429 с retry_after)"""
+    global _flood_wait_until
+    _flood_wait_until = max(_flood_wait_until, asyncio.get_running_loop().time() + seconds)
+
+
+async def _wait_flood_control():
+    """Ждет окончания паузы flood control, если она объявлена"""
+    delay = _flood_wait_until - asyncio.get_running_loop().time()
+    if delay > 0:
+        await asyncio.sleep(delay)
+
+
+class TelegramUnavailableError(Exception):
+    """Telegram временно недоступен (circuit breaker открыт) - отправка пропущена без запроса к API"""
+
+
+def _check_breaker():
+    """Бросает TelegramUnavailableError, пока circuit breaker открыт"""
+    remaining = _breaker_open_until - time.monotonic()
+    if remaining > 0:
+        raise TelegramUnavailableError(f"Telegram недоступен, отправки приостановлены еще на {remaining:.0f}с")
+
+
+def _record_send_success():
+    global _breaker_failures
+    _breaker_failures = 0
+
+
+def _record_send_failure():
+    """Учитывает неудачный вызов; после BREAKER_THRESHOLD подряд открывает breaker.
+
+    Время открытия растет экспоненциально (до BREAKER_MAX_OPEN_SECONDS) с jitter,
+    чтобы после восстановления API отправки не навалились все разом
+    """
+    global _breaker_failures, _breaker_open_until
+    _breaker_failures += 1
+    if _breaker_failures >= BREAKER_THRESHOLD:
+        open_for = min(BREAKER_MAX_OPEN_SECONDS, 2 ** (_breaker_failures - BREAKER_THRESHOLD + 1))
+        open_for *= random.uniform(0.5, 1.5)
+        _breaker_open_until = time.monotonic() + open_for
+        logger.warning("🚧 Telegram недоступен (%s ошибок подряд): отправки приостановлены на %.0fс",
+                       _breaker_failures, open_for)
+
 
 class TelegramService:
-    def __init__(self):
-        self.bot = Bot(token=settings.telegram_bot_token)
-        self.html_service = HTMLReportService()
-        self.MAX_MESSAGE_LENGTH = 4000  # Безопасный лимит для Telegram
+    # Сколько уведомлений о новых машинах может ждать в очереди (дальше - backpressure на скрапер)
+    NOTIFICATION_QUEUE_SIZE = 1000
+    # Попыток на один вызов Bot API (повторяем только 429 и сетевые ошибки)
+    MAX_SEND_ATTEMPTS = 3
+    # Сколько секунд при остановке досылаем очередь - должно укладываться в stop grace period Docker (10с).
+    # Недосланные машины остаются с is_notified=False и переотправляются при следующем старте
+    SHUTDOWN_DRAIN_TIMEOUT = 5
+
+    __slots__ = ("bot", "html_service", "_urgent_filter_names", "_queue", "_worker", "_pending", "_timestamps")
+
+    def __init__(self, bot: Optional[Bot] = None):
+        # Bot (и его aiohttp сессия) общий для всего приложения - см. get_bot()
+        self.bot = bot or get_bot()
+        self.html_service = get_html_service()
+        # Фильтры с urgent_mode - конфиг статичен, считаем один раз
+        self._urgent_filter_names = frozenset(
+            name for name, config in settings.car_filters.items() if config.get("urgent_mode", False)
+        )
+
+        # Очередь уведомлений (новые машины, urgent сводки): скрапер кладет их и идет дальше,
+        # отправкой в темпе лимитов Telegram занимается один фоновый worker.
+        # Элемент - (send, on_sent): фабрика отправки и необязательный колбэк после успешной отправки
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=self.NOTIFICATION_QUEUE_SIZE)
+        self._worker: Optional[asyncio.Task] = None
+        # Отправки, запущенные в фоне через send_in_background (держим ссылки, чтобы задачи не собрал GC)
+        self._pending: set = set()
+        # Отметки времени в сообщениях: формат -> (минута, строка)
+        self._timestamps: Dict[str, Tuple[int, str]] = {}
+
+    def _now_text(self, fmt: str = "%d.%m.%Y %H:%M") -> str:
+        """Текущее время строкой с точностью до минуты.
+
+        В пачке уведомлений время одно и то же - strftime вызываем раз в минуту на формат
+        """
+        minute = int(time.time() // 60)
+        cached = self._timestamps.get(fmt)
+        if cached is None or cached[0] != minute:
+            cached = (minute, datetime.now().strftime(fmt))
+            self._timestamps[fmt] = cached
+        return cached[1]
+
+    async def start(self):
+        """▶️ Запускает фоновый worker очереди уведомлений (повторный вызов ничего не делает)"""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._drain_notifications())
+            logger.info("✅ Telegram worker очереди уведомлений запущен")
+
+    async def _drain_notifications(self):
+        """Разбирает очередь уведомлений по одному, в порядке постановки"""
+        while True:
+            send, on_sent = await self._queue.get()
+            try:
+                await send()
+                if on_sent is not None:
+                    await on_sent()
+            except Exception as e:
+                # Ошибка отправки уже залогирована в методе отправки - worker продолжает работу
+                logger.debug("🔍 Уведомление из очереди не обработано: %s", e)
+            finally:
+                self._queue.task_done()
+
+    async def enqueue_new_car_notification(self, car: Car, urgent: bool = False, urgent_filter: bool = False,
+                                           on_sent: Optional[Callable[[Car], Awaitable[None]]] = None):
+        """📥 Ставит уведомление о новой машине в очередь на отправку.
+
+        Ждет только при переполненной очереди; сама отправка идет в фоне.
+        on_sent вызывается только после успешной отправки (например, чтобы отметить машину в БД)
+        """
+        await self.start()
+        await self._queue.put((
+            lambda: self.send_new_car_notification(car, urgent, urgent_filter),
+            (lambda: on_sent(car)) if on_sent is not None else None
+        ))
+
+    async def enqueue_urgent_summary(self, urgent_stats: Dict[str, int]):
+        """📥 Ставит urgent сводку в ту же очередь - она придет после уведомлений о машинах, которые сводит"""
+        await self.start()
+        await self._queue.put((lambda: self.send_urgent_summary(urgent_stats), None))
+
+    def send_in_background(self, send: Awaitable[Any]):
+        """🚀 Запускает отправку фоновой задачей и сразу возвращает управление.
+
+        Для уведомлений, результат которых вызывающему не нужен
+        (ошибки такие методы логируют сами). close() дожидается их завершения
+        """
+        task = asyncio.ensure_future(send)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _send(self, method: Callable[..., Awaitable[Any]], **kwargs) -> Any:
+        """Вызов Bot API через лимитеры с повторами только для временных ошибок.
+
+        429 - ждем retry_after от Telegram, сетевые ошибки и 5xx - экспоненциальная пауза с jitter (~1с, ~2с).
+        Остальные ошибки API (TelegramBadRequest и т.п.) постоянные - пробрасываем сразу,
+        чтобы не тратить на них лимит отправки. Пока открыт circuit breaker, в API не ходим вовсе
+        """
+        _check_breaker()
+        for attempt in range(1, self.MAX_SEND_ATTEMPTS + 1):
+            try:
+                result = await self._call_limited(method, **kwargs)
+                _record_send_success()
+                return result
+            except TelegramRetryAfter as e:
+                if attempt == self.MAX_SEND_ATTEMPTS:
+                    _record_send_failure()
+                    raise
+                logger.warning("⏳ Telegram flood control: ждем %sс и повторяем", e.retry_after)
+                _pause_sends(e.retry_after + 0.1)
+            except (TelegramNetworkError, TelegramServerError) as e:
+                if attempt == self.MAX_SEND_ATTEMPTS:
+                    _record_send_failure()
+                    raise
+                delay = 2 ** (attempt - 1) * random.uniform(0.5, 1.5)
+                logger.warning("🌐 Ошибка соединения с Telegram (попытка %s/%s): %s, повтор через %.1fс",
+                               attempt, self.MAX_SEND_ATTEMPTS, e, delay)
+                await asyncio.sleep(delay)
+
+    async def _call_limited(self, method: Callable[..., Awaitable[Any]], **kwargs) -> Any:
+        await _wait_flood_control()
+        async with _per_chat_limiter:
+            async with _overall_limiter:
+                return await method(chat_id=settings.telegram_chat_id, **kwargs)
+
+    async def _send_message(self, **kwargs) -> Any:
+        """Отправляет сообщение в чат уведомлений"""
+        return await self._send(self.bot.send_message, **kwargs)
+
+    async def _send_document(self, **kwargs) -> Any:
+        """Отправляет документ в чат уведомлений"""
+        return await self._send(self.bot.send_document, **kwargs)
+
+    async def _send_report_document(self, html_file_path: str, report_filename: str, caption: str,
+                                    **kwargs) -> Any:
+        """📎 Отправляет HTML отчет документом (как готовится файл - см. _report_input_file)"""
+        # По умолчанию файл идет вместе с выжимкой, которая уже пришла со звуком - второй пуш не нужен
+        kwargs.setdefault("disable_notification", True)
+        return await self._send_document(
+            document=await self._report_input_file(html_file_path, report_filename),
+            caption=caption,
+            **kwargs
+        )
+
+    async def _report_input_file(self, html_file_path: str, report_filename: str) -> InputFile:
+        """Готовит HTML отчет к загрузке.
+
+        Небольшой отчет читаем целиком одним async read (повторная отправка после 429
+        не трогает диск). Большой отдаем как FSInputFile - aiogram читает его чанками
+        через aiofiles прямо во время загрузки, весь файл в памяти не держится
+        """
+        if await aiofiles.os.path.getsize(html_file_path) > REPORT_STREAM_THRESHOLD:
+            return FSInputFile(html_file_path, filename=report_filename)
+
+        async with aiofiles.open(html_file_path, 'rb') as f:
+            data = await f.read()
+        return BufferedInputFile(data, filename=report_filename)
+
+    async def _send_report(self, html_file_path: str, report_filename: str, summary: str, caption: str) -> bool:
+        """📤 Отправляет выжимку отчета и HTML файл.
+
+        Если выжимка помещается в подпись к документу - это один вызов API (файл с выжимкой в подписи),
+        иначе сначала уходит выжимка, за ней файл с короткой подписью.
+        Возвращает True, если файл отправлен; ошибка отправки выжимки пробрасывается
+        """
+        if _tg_len(summary) <= MAX_CAPTION_LENGTH:
+            try:
+                await self._send_report_document(
+                    html_file_path,
+                    report_filename,
+                    caption=summary,
+                    parse_mode=ParseMode.HTML,
+                    disable_notification=False
+                )
+                return True
+            except Exception as e:
+                logger.error("❌ Ошибка отправки HTML файла с выжимкой: %s", e)
+                # Файл не ушел - отправляем хотя бы выжимку обычным сообщением
+                await self._send_message(
+                    text=summary,
+                    parse_mode=ParseMode.HTML,
+                    disable_web_page_preview=True
+                )
+                return False
+
+        # По очереди: оба вызова идут в один чат через один лимитер, а файл должен прийти после выжимки
+        await self._send_message(
+            text=summary,
+            parse_mode=ParseMode.HTML,
+            disable_web_page_preview=True
+        )
+
+        try:
+            await self._send_report_document(html_file_path, report_filename, caption=caption)
+        except Exception as e:
+            logger.error("❌ Ошибка отправки HTML файла: %s", e)
+            return False
+        return True
 
     async def send_new_car_notification(self, car: Car, urgent: bool = False, urgent_filter: bool = False):
         """Отправляет уведомление о новой машине"""
         message = self._format_car_message(car, urgent, urgent_filter)
         try:
-            await self.bot.send_message(
-                chat_id=settings.telegram_chat_id,
+            await self._send_message(
                 text=message,
                 parse_mode=ParseMode.HTML,
                 disable_web_page_preview=False
             )
             urgent_status = "🔥 URGENT" if urgent or urgent_filter else "обычное"
-            logger.info(f"✅ {urgent_status} уведомление отправлено для машины ID: {car.id}")
+            logger.info("✅ %s уведомление отправлено для машины ID: %s", urgent_status, car.id)
         except TelegramAPIError as e:
-            logger.error(f"❌ Telegram API ошибка для машины ID {car.id}: {e}")
+            logger.error("❌ Telegram API ошибка для машины ID %s: %s", car.id, e)
             raise
         except Exception as e:
-            logger.error(f"❌ Неожиданная ошибка отправки уведомления для машины ID {car.id}: {e}")
+            logger.error("❌ Неожиданная ошибка отправки уведомления для машины ID %s: %s", car.id, e)
             raise
 
     async def send_scheduled_analysis_report(self, analysis_result: Dict[str, Any]):
@@ -46,15 +437,17 @@ class TelegramService:
                 await self._send_error_notification(f"Scheduled анализ не удался: {analysis_result.get('error')}")
                 return
 
-            # Создаем HTML отчет
-            html_file_path = self.html_service.generate_analysis_report(analysis_result)
+            # Создаем HTML отчет (в отдельном потоке - не блокируем event loop)
+            html_file_path = await asyncio.to_thread(self.html_service.generate_analysis_report, analysis_result)
             report_filename = os.path.basename(html_file_path)
 
             # Специальное сообщение для scheduled анализа
-            current_time = datetime.now().strftime("%H:%M")
-            total_cars = analysis_result.get("total_cars_analyzed", 0)
-            recommended_count = len(analysis_result.get("recommended_car_ids", []))
-            brands_count = len(analysis_result.get("brands_analyzed", []))
+            current_time = self._now_text("%H:%M")
+            get = analysis_result.get
+            total_cars = get("total_cars_analyzed", 0)
+            recommended_count = len(get("recommended_car_ids", []))
+            brands_count = len(get("brands_analyzed", []))
+            short_conclusions = _esc(self._extract_short_conclusions(get("general_conclusions", ""))[:300])
 
             message = f"""🤖 <b>SCHEDULED AI АНАЛИЗ</b> • {current_time}
 
@@ -64,36 +457,25 @@ class TelegramService:
 ⭐ Лучших предложений: {recommended_count}
 
 💡 <b>Краткие выводы:</b>
-{self._extract_short_conclusions(analysis_result.get("general_conclusions", ""))[:300]}
+{short_conclusions}
 
-📄 <b>Полный отчет:</b> <code>{report_filename}</code>
+📄 <b>Полный отчет:</b> <code>{_esc(report_filename)}</code>
 📎 <i>HTML файл с детальным анализом</i>
 
 🔍 <i>Следующий анализ: в {'09:00' if datetime.now().hour >= 18 else '18:00'}</i>
 """
 
-            await self.bot.send_message(
-                chat_id=settings.telegram_chat_id,
-                text=message,
-                parse_mode=ParseMode.HTML,
-                disable_web_page_preview=True
-            )
-
-            # Отправляем HTML файл
-            try:
-                html_file = FSInputFile(html_file_path, filename=report_filename)
-                await self.bot.send_document(
-                    chat_id=settings.telegram_chat_id,
-                    document=html_file,
-                    caption=f"📊 Scheduled анализ • {total_cars} машин • {recommended_count} рекомендаций"
-                )
-                logger.info(f"✅ Scheduled анализ отправлен: {report_filename}")
-
-            except Exception as e:
-                logger.error(f"❌ Ошибка отправки scheduled HTML: {e}")
+            # Отправляем выжимку и HTML файл
+            if await self._send_report(
+                html_file_path,
+                report_filename,
+                summary=message,
+                caption=f"📊 Scheduled анализ • {total_cars} машин • {recommended_count} рекомендаций"
+            ):
+                logger.info("✅ Scheduled анализ отправлен: %s", report_filename)
 
         except Exception as e:
-            logger.error(f"❌ Ошибка отправки scheduled анализа: {e}")
+            logger.error("❌ Ошибка отправки scheduled анализа: %s", e)
             await self._send_error_notification(f"Ошибка scheduled анализа: {str(e)}")
 
     async def send_top_deals_notification(self, analysis_result: Dict[str, Any], recommended_ids: List[int]):
@@ -103,134 +485,104 @@ class TelegramService:
                 return
 
             cars_data = analysis_result.get("cars_data", [])
-            recommended_cars = [car for car in cars_data if car.get("id") in recommended_ids]
+            recommended_set = set(recommended_ids)
+            recommended_cars = [car for car in cars_data if car.get("id") in recommended_set]
 
             if not recommended_cars:
                 return
 
-            message = f"""💎 <b>ТОП ПРЕДЛОЖЕНИЯ ДНЯ</b>
-
-🎯 <b>Найдено {len(recommended_cars)} лучших вариантов:</b>
-
-"""
+            parts = [_format_top_deals_header(count=len(recommended_cars))]
 
             for i, car in enumerate(recommended_cars[:5], 1):  # Топ-5
-                car_id = car.get("id")
-                title = car.get("title", "")[:50] + ("..." if len(car.get("title", "")) > 50 else "")
-                brand = car.get("brand", "")
-                year = car.get("year", "")
-                price = car.get("price", "")
+                title = car.get("title") or ""
                 mileage = car.get("mileage")
-                link = car.get("link", "")
-
-                # Ищем описание с признаками хорошего предложения
-                description = car.get("description", "")
-                deal_indicators = self._extract_deal_indicators(description)
-
-                mileage_text = f"{mileage:,} км" if mileage else "н/д"
-
-                message += f"""<b>{i}. {brand} {year}</b>
-📝 {title}
-💰 {price} • 🛣 {mileage_text}
-{deal_indicators}
-🔗 <a href="{link}">Посмотреть</a>
 
-"""
-
-            message += f"""
-🤖 <i>Анализ основан на соотношении цена/качество, состоянии и описании</i>
-⏰ <i>Обновляется 2 раза в день</i>
-"""
-
-            await self.bot.send_message(
-                chat_id=settings.telegram_chat_id,
+                # Поля приходят с сайта - экранируем, иначе '<' в тексте ломает ParseMode.HTML
+                parts.append(_format_top_deal_row(
+                    i=i,
+                    brand=_esc(car.get("brand") or ""),
+                    year=car.get("year", ""),
+                    title=_esc(_ellipsize(title, 50)),
+                    price=_esc(car.get("price") or ""),
+                    mileage=f"{mileage:,} км" if mileage else "н/д",
+                    # Ищем в описании признаки хорошего предложения
+                    indicators=self._extract_deal_indicators(car.get("description", "")),
+                    link=_esc(car.get("link") or "", quote=True)
+                ))
+
+            parts.append(_TOP_DEALS_FOOTER)
+            message = "".join(parts)
+
+            await self._send_message(
                 text=message,
                 parse_mode=ParseMode.HTML,
                 disable_web_page_preview=False
             )
 
-            logger.info(f"✅ Топ предложения отправлены: {len(recommended_cars)} машин")
+            logger.info("✅ Топ предложения отправлены: %s машин", len(recommended_cars))
 
         except Exception as e:
-            logger.error(f"❌ Ошибка отправки топ предложений: {e}")
+            logger.error("❌ Ошибка отправки топ предложений: %s", e)
 
     def _extract_deal_indicators(self, description: str) -> str:
         """Извлекает индикаторы хорошего предложения из описания"""
         if not description:
             return "📋 <i>без описания</i>"
 
-        indicators = []
         desc_lower = description.lower()
 
-        # Позитивные индикаторы
-        if any(word in desc_lower for word in ["срочно", "urgent", "переезд", "быстро"]):
-            indicators.append("🔥 срочно")
-        if any(word in desc_lower for word in ["отличное", "идеальное", "perfect", "excellent"]):
-            indicators.append("✨ отличное состояние")
-        if any(word in desc_lower for word in ["сервис", "то", "обслуживание", "service"]):
-            indicators.append("🔧 сервисная история")
-        if any(word in desc_lower for word in ["один владелец", "one owner", "первый"]):
-            indicators.append("👤 один владелец")
-        if any(word in desc_lower for word in ["снижена", "скидка", "reduced", "discount"]):
-            indicators.append("💸 снижена цена")
-
+        # Позитивные индикаторы - показываем максимум 3, остальные группы не проверяем
+        indicators = list(islice(
+            (label for pattern, label in _DEAL_INDICATORS if pattern.search(desc_lower)), 3
+        ))
         if indicators:
-            return "💡 " + " • ".join(indicators[:3])  # Максимум 3 индикатора
+            return "💡 " + " • ".join(indicators)
         else:
             # Показываем начало описания
-            desc_short = description[:80] + "..." if len(description) > 80 else description
+            desc_short = _esc(_ellipsize(description, 80))
             return f"📝 <i>{desc_short}</i>"
 
     async def send_ai_analysis_report(self, analysis_result: Dict[str, Any], urgent_mode: bool = False):
         """🤖 Отправляет AI анализ: краткую выжимку + HTML отчет"""
         try:
             if not analysis_result.get("success", True):
-                error_message = f"❌ <b>Ошибка AI анализа</b>\n\n{analysis_result.get('error', 'Неизвестная ошибка')}"
-                await self.bot.send_message(
-                    chat_id=settings.telegram_chat_id,
+                error_message = f"❌ <b>Ошибка AI анализа</b>\n\n{_esc(str(analysis_result.get('error', 'Неизвестная ошибка')))}"
+                await self._send_message(
                     text=error_message,
                     parse_mode=ParseMode.HTML
                 )
                 return
 
-            # 1. Создаем HTML отчет
-            html_file_path = self.html_service.generate_analysis_report(analysis_result)
+            # 1. Создаем HTML отчет (в отдельном потоке - не блокируем event loop)
+            html_file_path = await asyncio.to_thread(self.html_service.generate_analysis_report, analysis_result)
             report_filename = os.path.basename(html_file_path)
 
-            # 2. Отправляем краткую выжимку
+            # 2. Готовим краткую выжимку
             summary_message = self._create_analysis_summary(analysis_result, report_filename, urgent_mode)
+            total_cars = analysis_result.get("total_cars_analyzed", 0)
 
-            await self.bot.send_message(
-                chat_id=settings.telegram_chat_id,
-                text=summary_message,
-                parse_mode=ParseMode.HTML,
-                disable_web_page_preview=True
+            # 3. Отправляем выжимку и HTML файл (одним сообщением, если выжимка влезает в подпись)
+            document_sent = await self._send_report(
+                html_file_path,
+                report_filename,
+                summary=summary_message,
+                caption=f"📄 Полный AI отчет • {total_cars} машин"
             )
 
-            # 3. Отправляем HTML файл как документ
-            try:
-                html_file = FSInputFile(html_file_path, filename=report_filename)
-                await self.bot.send_document(
-                    chat_id=settings.telegram_chat_id,
-                    document=html_file,
-                    caption=f"📄 Полный AI отчет • {analysis_result.get('total_cars_analyzed', 0)} машин"
-                )
-                logger.info(f"✅ HTML отчет отправлен: {report_filename}")
-
-            except Exception as e:
-                logger.error(f"❌ Ошибка отправки HTML файла: {e}")
+            if not document_sent:
                 # Отправляем хотя бы уведомление о создании файла
-                await self.bot.send_message(
-                    chat_id=settings.telegram_chat_id,
-                    text=f"📄 HTML отчет создан: <code>{report_filename}</code>\n"
+                await self._send_message(
+                    text=f"📄 HTML отчет создан: <code>{_esc(report_filename)}</code>\n"
                          f"Файл сохранен локально, но не удалось отправить в Telegram.",
                     parse_mode=ParseMode.HTML
                 )
+            else:
+                logger.info("✅ HTML отчет отправлен: %s", report_filename)
 
-            logger.info(f"✅ AI анализ отправлен: {analysis_result.get('total_cars_analyzed', 0)} машин")
+            logger.info("✅ AI анализ отправлен: %s машин", total_cars)
 
         except Exception as e:
-            logger.error(f"❌ Ошибка отправки AI анализа: {e}")
+            logger.error("❌ Ошибка отправки AI анализа: %s", e)
             await self._send_error_notification(f"Ошибка создания отчета: {str(e)}")
 
     def _create_analysis_summary(self, analysis_result: Dict[str, Any], report_filename: str,
@@ -238,87 +590,92 @@ class TelegramService:
         """Создает краткую выжимку для Telegram (в пределах лимита)"""
 
         # Базовая информация
-        filter_name = analysis_result.get("filter_name", "машин")
-        total_cars = analysis_result.get("total_cars_analyzed", 0)
-        model_used = analysis_result.get("model_used", "AI")
-        recommended_ids = analysis_result.get("recommended_car_ids", [])
+        get = analysis_result.get
+        filter_name = get("filter_name", "машин")
+        total_cars = get("total_cars_analyzed", 0)
+        model_used = get("model_used", "AI")
+        recommended_ids = get("recommended_car_ids", [])
+        ids_count = len(recommended_ids)
 
         # Начинаем с заголовка
-        urgent_emoji = "🔥🔥 " if urgent_mode else ""
-        urgent_text = "URGENT " if urgent_mode else ""
-
-        message = f"""{urgent_emoji}🤖 <b>{urgent_text}AI АНАЛИЗ ЗАВЕРШЕН</b>
-
-📊 <b>Фильтр:</b> {filter_name.title()} {'(🔥 URGENT режим)' if urgent_mode else ''}
-🚗 <b>Проанализировано:</b> {total_cars} машин
-⭐ <b>Рекомендовано:</b> {len(recommended_ids)} машин
-🧠 <b>Модель:</b> {model_used}
-
-"""
+        header = _format_summary_header(
+            urgent_emoji="🔥🔥 " if urgent_mode else "",
+            urgent_text="URGENT " if urgent_mode else "",
+            filter=_display_filter(filter_name),
+            urgent_suffix="(🔥 URGENT режим)" if urgent_mode else "",
+            total=total_cars,
+            recommended=ids_count,
+            model=_esc(str(model_used))
+        )
+        footer = (f"📄 <b>Полный отчет:</b> <code>{_esc(report_filename)}</code>\n"
+                  "📎 <i>HTML файл с полным анализом</i>")
+
+        # Необязательные секции добавляем, пока укладываемся в лимит Telegram (в UTF-16),
+        # вместо обрезки готового текста, которая может разрезать HTML-тег
+        parts = [header]
+        budget = MAX_MESSAGE_LENGTH - _tg_len(header) - _tg_len(footer)
+
+        def add_section(section: str):
+            nonlocal budget
+            size = _tg_len(section)
+            if size <= budget:
+                parts.append(section)
+                budget -= size
 
         # Добавляем топ-3 рекомендации (сокращенно)
-        top_recommendations = analysis_result.get("top_recommendations", "")
+        top_recommendations = get("top_recommendations", "")
         if top_recommendations:
             short_recs = self._extract_short_recommendations(top_recommendations)
-            message += f"🏆 <b>ТОП РЕКОМЕНДАЦИИ:</b>\n{short_recs}\n\n"
+            add_section(f"🏆 <b>ТОП РЕКОМЕНДАЦИИ:</b>\n{_esc(short_recs)}\n\n")
 
         # Краткие выводы (первые 2-3 предложения)
-        conclusions = analysis_result.get("general_conclusions", "")
+        conclusions = get("general_conclusions", "")
         if conclusions:
             short_conclusions = self._extract_short_conclusions(conclusions)
-            message += f"📝 <b>ВЫВОДЫ:</b>\n{short_conclusions}\n\n"
+            add_section(f"📝 <b>ВЫВОДЫ:</b>\n{_esc(short_conclusions)}\n\n")
 
         # Рекомендованные ID
-        if recommended_ids:
-            ids_str = ", ".join(str(id_) for id_ in recommended_ids[:8])  # Максимум 8 ID
-            if len(recommended_ids) > 8:
-                ids_str += f" (+{len(recommended_ids) - 8} еще)"
-            message += f"⭐ <b>ID рекомендованных:</b> {ids_str}\n\n"
+        if ids_count:
+            ids_str = ", ".join(map(str, recommended_ids[:MAX_SUMMARY_IDS]))
+            overflow = ids_count - MAX_SUMMARY_IDS
+            if overflow > 0:
+                ids_str += f" (+{overflow} еще)"
+            add_section(f"⭐ <b>ID рекомендованных:</b> {ids_str}\n\n")
 
         # Уведомление о полном отчете
-        message += f"📄 <b>Полный отчет:</b> <code>{report_filename}</code>\n"
-        message += f"📎 <i>HTML файл отправлен отдельным сообщением</i>"
-
-        # Проверяем лимит и обрезаем если нужно
-        if len(message) > self.MAX_MESSAGE_LENGTH:
-            message = message[
-                      :self.MAX_MESSAGE_LENGTH - 100] + f"...\n\n📄 <b>Полный отчет:</b> <code>{report_filename}</code>"
-
-        return message
+        parts.append(footer)
+        return "".join(parts)
 
     def _extract_short_recommendations(self, recommendations: str) -> str:
         """Извлекает короткие рекомендации (топ-3)"""
 
-        lines = [line.strip() for line in recommendations.split('\n') if line.strip()]
-
-        # Берем только первые 3 рекомендации
-        rec_lines = []
-        count = 0
+        # Один ленивый проход по строкам: splitlines() не строит список всех строк,
+        # разбор останавливается на третьей рекомендации
+        numbered = (
+            line for line in (m.group().strip() for m in _LINE_RE.finditer(recommendations))
+            # Пропускаем пустые строки и разделители, берем пронумерованные рекомендации
+            # (цифра в первых 5 символах, включая ❶, ①, ⒈ и т.п. - как их понимает str.isdigit)
+            if line and not line.startswith('─') and any(c.isdigit() for c in line[:5])
+        )
 
-        for line in lines:
-            if line and not line.startswith('─') and count < 3:
-                # Убираем лишние символы и сокращаем
-                if any(char.isdigit() for char in line[:5]):  # Это пронумерованная рекомендация
-                    short_line = line[:80] + "..." if len(line) > 80 else line
-                    rec_lines.append(short_line)
-                    count += 1
+        # Берем только первые 3 рекомендации - дальше текст не разбираем
+        rec_lines = [_ellipsize(line, 80) for line in islice(numbered, 3)]
 
         return '\n'.join(rec_lines) if rec_lines else "См. полный отчет"
 
     def _extract_short_conclusions(self, conclusions: str) -> str:
         """Извлекает краткие выводы (первые 2-3 предложения)"""
 
-        # Разбиваем на предложения
-        sentences = [s.strip() for s in conclusions.replace('\n', ' ').split('.') if s.strip()]
+        # Разбиваем на предложения лениво - нужны только первые 3,
+        # весь текст целиком не копируем и не режем
+        sentences = (m.group().strip().replace('\n', ' ') for m in _SENTENCE_RE.finditer(conclusions))
 
         # Берем первые 2-3 предложения
-        short_sentences = sentences[:3]
-        short_text = '. '.join(short_sentences)
+        short_text = '. '.join(islice(filter(None, sentences), 3))
 
-        if len(short_text) > 300:
-            short_text = short_text[:300] + "..."
+        short_text = _ellipsize(short_text, 300)
 
-        return short_text + "." if short_text and not short_text.endswith('.') else short_text
+        return short_text + "." if short_text and not short_text.endswith(('.', '…')) else short_text
 
     async def send_quick_analysis_notification(self, analysis_result: Dict[str, Any], urgent_mode: bool = False):
         """⚡ Отправляет краткое уведомление о быстром анализе"""
@@ -326,45 +683,34 @@ class TelegramService:
             if not analysis_result.get("success", True):
                 return
 
-            filter_name = analysis_result.get("filter_name", "машин")
-            total_cars = analysis_result.get("total_cars", 0)
-            quick_rec = analysis_result.get("quick_recommendation", "Нет рекомендации")
-            rec_link = analysis_result.get("recommended_link")
+            get = analysis_result.get
+            filter_name = get("filter_name", "машин")
+            total_cars = get("total_cars", 0)
+            quick_rec = get("quick_recommendation", "Нет рекомендации")
+            rec_link = get("recommended_link")
 
             # Обрезаем рекомендацию если слишком длинная
-            if len(quick_rec) > 200:
-                quick_rec = quick_rec[:200] + "..."
-
-            urgent_emoji = "🔥⚡ " if urgent_mode else "⚡ "
-            urgent_text = "URGENT " if urgent_mode else ""
-
-            message = f"""{urgent_emoji}<b>{urgent_text}Быстрый AI анализ</b>
-
-🎯 <b>Фильтр:</b> {filter_name.title()} {'(🔥 URGENT)' if urgent_mode else ''}
-📊 <b>Машин:</b> {total_cars}
-
-🤖 <b>Рекомендация:</b>
-{quick_rec}
-"""
-
-            if rec_link:
-                message += f"\n🔗 <a href=\"{rec_link}\">Посмотреть объявление</a>"
-
-            message += """
-
-💡 <i>Для детального анализа используйте /analysis</i>
-"""
+            quick_rec = _ellipsize(quick_rec, 200)
+
+            message = _format_quick_analysis(
+                urgent_emoji="🔥⚡ " if urgent_mode else "⚡ ",
+                urgent_text="URGENT " if urgent_mode else "",
+                filter=_display_filter(filter_name),
+                urgent_suffix="(🔥 URGENT)" if urgent_mode else "",
+                total=total_cars,
+                recommendation=_esc(quick_rec),
+                link=f"\n🔗 <a href=\"{_esc(rec_link, quote=True)}\">Посмотреть объявление</a>" if rec_link else ""
+            )
 
-            await self.bot.send_message(
-                chat_id=settings.telegram_chat_id,
+            await self._send_message(
                 text=message,
                 parse_mode=ParseMode.HTML
             )
 
-            logger.info(f"✅ Быстрый анализ отправлен: {filter_name} {'(URGENT)' if urgent_mode else ''}")
+            logger.info("✅ Быстрый анализ отправлен: %s %s", filter_name, '(URGENT)' if urgent_mode else '')
 
         except Exception as e:
-            logger.error(f"❌ Ошибка отправки быстрого анализа: {e}")
+            logger.error("❌ Ошибка отправки быстрого анализа: %s", e)
 
     async def send_urgent_summary(self, urgent_stats: Dict[str, int]):
         """🔥 Отправляет сводку по urgent фильтрам"""
@@ -374,37 +720,37 @@ class TelegramService:
             if total_urgent == 0:
                 return
 
-            message = f"""🔥🔥 <b>URGENT СВОДКА</b> 🔥🔥
+            parts = [f"""🔥🔥 <b>URGENT СВОДКА</b> 🔥🔥
 
 🚨 <b>Найдено {total_urgent} срочных объявлений!</b>
 
-"""
+"""]
 
             for filter_name, count in urgent_stats.items():
                 if count > 0:
-                    message += f"🔥 <b>{filter_name}:</b> {count} машин\n"
+                    parts.append(f"🔥 <b>{_esc(filter_name)}:</b> {count} машин\n")
 
-            message += f"""
+            parts.append("""
 
 ⚡ <i>AI анализ запущен автоматически</i>
 🔗 <i>Детальные отчеты следуют...</i>
-"""
+""")
+            message = "".join(parts)
 
-            await self.bot.send_message(
-                chat_id=settings.telegram_chat_id,
+            await self._send_message(
                 text=message,
                 parse_mode=ParseMode.HTML
             )
 
-            logger.info(f"🔥 Urgent сводка отправлена: {total_urgent} машин из {len(urgent_stats)} фильтров")
+            logger.info("🔥 Urgent сводка отправлена: %s машин из %s фильтров", total_urgent, len(urgent_stats))
 
         except Exception as e:
-            logger.error(f"❌ Ошибка отправки urgent сводки: {e}")
+            logger.error("❌ Ошибка отправки urgent сводки: %s", e)
 
     async def send_analysis_summary(self, summaries: List[Dict[str, Any]]):
         """📊 Отправляет сводку по всем фильтрам"""
         try:
-            message = "📊 <b>СВОДКА AI АНАЛИЗА</b>\n\n"
+            parts = ["📊 <b>СВОДКА AI АНАЛИЗА</b>\n\n"]
 
             total_reports = 0
             urgent_count = 0
@@ -415,13 +761,12 @@ class TelegramService:
                 success = summary.get("success", False)
 
                 # Проверяем если это urgent фильтр
-                filter_config = settings.car_filters.get(filter_name, {})
-                is_urgent = filter_config.get("urgent_mode", False)
+                is_urgent = filter_name in self._urgent_filter_names
 
                 status_emoji = "✅" if success else "❌"
                 urgent_emoji = " 🔥" if is_urgent else ""
 
-                message += f"{status_emoji} <b>{filter_name.title()}{urgent_emoji}:</b> {total_cars} машин\n"
+                parts.append(f"{status_emoji} <b>{_display_filter(filter_name)}{urgent_emoji}:</b> {total_cars} машин\n")
 
                 if success:
                     total_reports += 1
@@ -429,57 +774,56 @@ class TelegramService:
                         urgent_count += 1
                     quick_rec = summary.get("quick_recommendation", "")
                     if quick_rec:
-                        rec_short = quick_rec[:60] + "..." if len(quick_rec) > 60 else quick_rec
-                        message += f"   💡 {rec_short}\n"
+                        parts.append(f"   💡 {_esc(_ellipsize(quick_rec, 60))}\n")
 
-                message += "\n"
+                parts.append("\n")
 
-            message += f"📄 <b>Создано HTML отчетов:</b> {total_reports}\n"
+            parts.append(f"📄 <b>Создано HTML отчетов:</b> {total_reports}\n")
             if urgent_count > 0:
-                message += f"🔥 <b>Urgent отчетов:</b> {urgent_count}\n"
-            message += "<i>🤖 Файлы отправлены отдельными сообщениями</i>"
+                parts.append(f"🔥 <b>Urgent отчетов:</b> {urgent_count}\n")
+            parts.append("<i>🤖 Файлы отправлены отдельными сообщениями</i>")
+            message = "".join(parts)
 
-            await self.bot.send_message(
-                chat_id=settings.telegram_chat_id,
+            await self._send_message(
                 text=message,
                 parse_mode=ParseMode.HTML
             )
 
-            logger.info(
-                f"✅ Сводка анализа отправлена: {len(summaries)} фильтров, {total_reports} отчетов, {urgent_count} urgent")
+            logger.info("✅ Сводка анализа отправлена: %s фильтров, %s отчетов, %s urgent",
+                        len(summaries), total_reports, urgent_count)
 
         except Exception as e:
-            logger.error(f"❌ Ошибка отправки сводки: {e}")
+            logger.error("❌ Ошибка отправки сводки: %s", e)
 
     async def send_reports_list(self):
         """📋 Отправляет список созданных HTML отчетов"""
         try:
-            reports = self.html_service.get_reports_list(10)
+            reports = await asyncio.to_thread(self.html_service.get_reports_list, 10)
 
             if not reports:
                 message = "📋 <b>Список отчетов</b>\n\nНет созданных отчетов"
             else:
-                message = "📋 <b>Последние HTML отчеты</b>\n\n"
+                parts = ["📋 <b>Последние HTML отчеты</b>\n\n"]
 
                 for i, report in enumerate(reports, 1):
                     filename = report["filename"]
                     size = report["size_mb"]
                     created = report["created"]
 
-                    message += f"{i}. <code>{filename}</code>\n"
-                    message += f"   📅 {created} • {size} MB\n\n"
+                    parts.append(f"{i}. <code>{_esc(filename)}</code>\n")
+                    parts.append(f"   📅 {created} • {size} MB\n\n")
 
                 if len(reports) == 10:
-                    message += "<i>Показаны последние 10 отчетов</i>"
+                    parts.append("<i>Показаны последние 10 отчетов</i>")
+                message = "".join(parts)
 
-            await self.bot.send_message(
-                chat_id=settings.telegram_chat_id,
+            await self._send_message(
                 text=message,
                 parse_mode=ParseMode.HTML
             )
 
         except Exception as e:
-            logger.error(f"❌ Ошибка отправки списка отчетов: {e}")
+            logger.error("❌ Ошибка отправки списка отчетов: %s", e)
 
     async def send_error_notification(self, error_text: str):
         """Отправляет уведомление об ошибке (public метод)"""
@@ -488,14 +832,14 @@ class TelegramService:
     async def _send_error_notification(self, error_text: str):
         """Отправляет уведомление об ошибке"""
         try:
-            message = f"❌ <b>Ошибка системы</b>\n\n{error_text}"
-            await self.bot.send_message(
-                chat_id=settings.telegram_chat_id,
+            # Текст ошибки экранируем - иначе '<' из исключения дает 400 от Telegram
+            message = f"❌ <b>Ошибка системы</b>\n\n{_esc(error_text)}"
+            await self._send_message(
                 text=message,
                 parse_mode=ParseMode.HTML
             )
         except Exception as e:
-            logger.error(f"❌ Не удалось отправить уведомление об ошибке: {e}")
+            logger.error("❌ Не удалось отправить уведомление об ошибке: %s", e)
 
     def _format_car_message(self, car: Car, urgent: bool = False, urgent_filter: bool = False) -> str:
         """Форматирует сообщение о новой машине"""
@@ -510,46 +854,63 @@ class TelegramService:
         else:
             header = ""
 
-        filter_suffix = f" (фильтр: {car.filter_name})" if urgent_filter else ""
-
-        return f"""
-{header}🚗 <b>Новое объявление - {car.brand}</b>{filter_suffix}
-
-📝 <b>Заголовок:</b> {car.title}
-💰 <b>Цена:</b> {car.price}
-📅 <b>Год:</b> {car.year or 'нет данных'}
-🛣 <b>Пробег:</b> {f"{car.mileage:,} км" if car.mileage else 'нет данных'}
-📍 <b>Место:</b> {car.place}
-📆 <b>Дата публикации:</b> {car.date_posted}
-
-🔗 <a href="{car.link}">Посмотреть объявление</a>
-
-⚙️ <b>Характеристики:</b> {car.features}
-
-📝 <b>Описание:</b> {car.description or 'нет описания'}
-        """.strip()
+        # Поля приходят с сайта - экранируем, иначе '<' в тексте ломает ParseMode.HTML
+        filter_suffix = f" (фильтр: {_esc(car.filter_name or '')})" if urgent_filter else ""
+
+        return _format_car_message_text(
+            header=header,
+            brand=_esc(car.brand or ''),
+            filter_suffix=filter_suffix,
+            title=_esc(car.title or ''),
+            price=_esc(car.price or ''),
+            year=car.year or 'нет данных',
+            mileage=f"{car.mileage:,} км" if car.mileage else 'нет данных',
+            place=_esc(car.place or ''),
+            date_posted=_esc(car.date_posted or ''),
+            link=_esc(car.link or '', quote=True),
+            features=_esc(car.features or ''),
+            description=_esc(car.description) if car.description else 'нет описания'
+        )
 
     async def close(self):
         """Закрытие сессии Telegram бота"""
+        if self._worker is not None:
+            # Досылаем то, что уже в очереди, но не дольше SHUTDOWN_DRAIN_TIMEOUT -
+            # иначе Docker убьет процесс посреди отправки
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=self.SHUTDOWN_DRAIN_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning("⚠️ Очередь уведомлений не дослана за %sс: осталось %s (переотправятся при старте)",
+                               self.SHUTDOWN_DRAIN_TIMEOUT, self._queue.qsize())
+            # Дожидаемся отмены воркера, чтобы он не отправлял через уже закрытую сессию
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
+        if self._pending:
+            _, not_done = await asyncio.wait(self._pending, timeout=self.SHUTDOWN_DRAIN_TIMEOUT)
+            for task in not_done:
+                task.cancel()
+            await asyncio.gather(*not_done, return_exceptions=True)
+
         try:
-            if hasattr(self.bot, 'session') and self.bot.session:
-                await self.bot.session.close()
-                logger.info("✅ Telegram bot session закрыта")
+            await self.bot.session.close()
+            logger.info("✅ Telegram bot session закрыта")
         except Exception as e:
-            logger.error(f"❌ Ошибка закрытия Telegram session: {e}")
+            logger.error("❌ Ошибка закрытия Telegram session: %s", e)
 
     # 🆕 МЕТОДЫ ДЛЯ УВЕДОМЛЕНИЙ ОБ ИЗМЕНЕНИЯХ
 
     async def send_car_changes_notification(self, car, changes: Dict[str, Any]):
             """🔄 Отправляет уведомление об изменениях в объявлении"""
-            logger.info(f"📱 send_car_changes_notification() called for car {car.id}")
+            logger.info("📱 send_car_changes_notification() called for car %s", car.id)
 
             try:
                 price_changed = changes.get("price_changed", False)
                 description_changed = changes.get("description_changed", False)
 
-                logger.info(
-                    f"📊 Changes summary for car {car.id}: price={price_changed}, description={description_changed}")
+                logger.info("📊 Changes summary for car %s: price=%s, description=%s",
+                            car.id, price_changed, description_changed)
 
                 # Определяем тип изменения для заголовка
                 if price_changed and description_changed:
@@ -559,70 +920,77 @@ class TelegramService:
                 elif description_changed:
                     header = "🔄📝 <b>ИЗМЕНЕНИЕ ОПИСАНИЯ</b>"
                 else:
-                    logger.warning(f"⚠️ No changes detected for car {car.id} - skipping notification")
+                    logger.warning("⚠️ No changes detected for car %s - skipping notification", car.id)
                     return  # Нет изменений
 
-                message = f"""{header}
+                parts = [f"""{header}
 
-    🚗 <b>Автомобиль:</b> {car.brand} {car.year or ''}
-    📝 <b>Название:</b> {car.title[:60]}{'...' if len(car.title) > 60 else ''}
+    🚗 <b>Автомобиль:</b> {_esc(car.brand or '')} {car.year or ''}
+    📝 <b>Название:</b> {_esc(_ellipsize(car.title or '', 60))}
     🆔 <b>ID:</b> {car.id}
 
-    """
+    """]
 
                 # Добавляем информацию об изменении цены
                 if price_changed:
                     old_price = changes.get("old_price", "неизвестно")
                     new_price = changes.get("new_price", "неизвестно")
 
-                    logger.info(f"💰 Price change details for car {car.id}: '{old_price}' → '{new_price}'")
+                    logger.info("💰 Price change details for car %s: '%s' → '%s'", car.id, old_price, new_price)
 
                     # Определяем направление изменения цены
-                    price_direction = self._analyze_price_change(old_price, new_price)
+                    price_direction = self._analyze_price_change(
+                        old_price, new_price, changes.get("old_price_num"), changes.get("new_price_num")
+                    )
 
-                    message += f"""💰 <b>ИЗМЕНЕНИЕ ЦЕНЫ:</b>
-    📊 Было: {old_price}
-    📊 Стало: {new_price}
+                    parts.append(f"""💰 <b>ИЗМЕНЕНИЕ ЦЕНЫ:</b>
+    📊 Было: {_esc(str(old_price))}
+    📊 Стало: {_esc(str(new_price))}
     {price_direction}
 
-    """
+    """)
 
                 # Добавляем информацию об изменении описания
                 if description_changed:
                     old_desc = changes.get("old_description", "")
                     new_desc = changes.get("new_description", "")
 
-                    logger.info(f"📝 Description change details for car {car.id}: "
-                                f"{len(old_desc)} chars → {len(new_desc)} chars")
+                    logger.info("📝 Description change details for car %s: %s chars → %s chars",
+                                car.id, len(old_desc), len(new_desc))
 
                     # Показываем первые 100 символов старого и нового описания
-                    old_desc_short = (old_desc[:100] + "...") if len(old_desc) > 100 else old_desc
-                    new_desc_short = (new_desc[:100] + "...") if len(new_desc) > 100 else new_desc
+                    old_desc_short = _esc(_ellipsize(old_desc, 100))
+                    new_desc_short = _esc(_ellipsize(new_desc, 100))
 
-                    message += f"""📝 <b>ИЗМЕНЕНИЕ ОПИСАНИЯ:</b>
+                    description_part = f"""📝 <b>ИЗМЕНЕНИЕ ОПИСАНИЯ:</b>
     📄 Было: "{old_desc_short or 'пустое'}"
     📄 Стало: "{new_desc_short or 'пустое'}"
 
     """
+                    # Описание - необязательная секция: пропускаем ее, если сообщение не влезет в лимит
+                    if _tg_len("".join(parts)) + _tg_len(description_part) <= MAX_MESSAGE_LENGTH - 200:
+                        parts.append(description_part)
+                    else:
+                        logger.warning("⚠️ Description diff for car %s skipped - message too long", car.id)
 
-                message += f"""🔗 <a href="{car.link}">Посмотреть объявление</a>
+                parts.append(f"""🔗 <a href="{_esc(car.link or '', quote=True)}">Посмотреть объявление</a>
 
-    ⏰ <i>Проверка изменений: {datetime.now().strftime('%d.%m.%Y %H:%M')}</i>"""
+    ⏰ <i>Проверка изменений: {self._now_text()}</i>""")
+                message = "".join(parts)
 
-                logger.debug(f"📱 Sending change notification message for car {car.id} ({len(message)} chars)")
+                logger.debug("📱 Sending change notification message for car %s (%s chars)", car.id, len(message))
 
-                await self.bot.send_message(
-                    chat_id=settings.telegram_chat_id,
+                await self._send_message(
                     text=message,
                     parse_mode=ParseMode.HTML,
                     disable_web_page_preview=False
                 )
 
-                logger.info(f"✅ Changes notification sent successfully for car {car.id}")
+                logger.info("✅ Changes notification sent successfully for car %s", car.id)
 
             except Exception as e:
-                logger.error(f"❌ Error sending changes notification for car {car.id}: {str(e)}")
-                logger.debug(f"🔍 Exception details: {type(e).__name__}: {str(e)}")
+                logger.error("❌ Error sending changes notification for car %s: %s", car.id, e)
+                logger.debug("🔍 Exception details: %s: %s", type(e).__name__, e)
 
     async def send_daily_changes_summary(self, summary: Dict[str, Any]):
             """📊 Отправляет ежедневную сводку изменений"""
@@ -637,9 +1005,10 @@ class TelegramService:
                 error_count = summary.get("error_count", 0)
                 elapsed_seconds = summary.get("elapsed_seconds", 0)
 
-                logger.info(f"📊 Summary stats: {total_checked} checked, {total_changes} changes, "
-                            f"{price_changes} price, {description_changes} desc, "
-                            f"{unavailable_count} unavailable, {error_count} errors, {elapsed_seconds:.1f}s")
+                logger.info("📊 Summary stats: %s checked, %s changes, %s price, %s desc, "
+                            "%s unavailable, %s errors, %.1fs",
+                            total_checked, total_changes, price_changes, description_changes,
+                            unavailable_count, error_count, elapsed_seconds)
 
                 if total_changes == 0 and unavailable_count == 0 and error_count == 0:
                     # Если изменений нет, отправляем краткую сводку
@@ -650,46 +1019,46 @@ class TelegramService:
     ❌ Недоступных: {unavailable_count}
     ⏱️ Время: {elapsed_seconds:.1f}с
 
-    ⏰ {datetime.now().strftime('%d.%m.%Y %H:%M')}"""
+    ⏰ {self._now_text()}"""
                     logger.info("📱 Sending brief summary (no changes)")
                 else:
                     # Подробная сводка с изменениями
-                    message = f"""📊 <b>ЕЖЕДНЕВНАЯ СВОДКА ИЗМЕНЕНИЙ</b>
+                    parts = [f"""📊 <b>ЕЖЕДНЕВНАЯ СВОДКА ИЗМЕНЕНИЙ</b>
 
     🔍 <b>Проверено объявлений:</b> {total_checked}
     🔄 <b>Найдено изменений:</b> {total_changes}
 
-    """
+    """]
                     if price_changes > 0:
-                        message += f"💰 Изменения цен: {price_changes}\n"
+                        parts.append(f"💰 Изменения цен: {price_changes}\n")
                     if description_changes > 0:
-                        message += f"📝 Изменения описаний: {description_changes}\n"
+                        parts.append(f"📝 Изменения описаний: {description_changes}\n")
                     if unavailable_count > 0:
-                        message += f"❌ Недоступных/проданных: {unavailable_count}\n"
+                        parts.append(f"❌ Недоступных/проданных: {unavailable_count}\n")
                     if error_count > 0:
-                        message += f"⚠️ Ошибок при проверке: {error_count}\n"
+                        parts.append(f"⚠️ Ошибок при проверке: {error_count}\n")
 
                     success_rate = ((total_checked - error_count) / total_checked * 100) if total_checked > 0 else 0
-                    message += f"""
+                    parts.append(f"""
     📈 <b>Эффективность:</b> {success_rate:.1f}% успешных проверок
     ⏱️ <b>Время выполнения:</b> {elapsed_seconds:.1f} секунд
 
     ⏰ <i>Следующая проверка: завтра в то же время</i>
-    🕐 <i>Время проверки: {datetime.now().strftime('%d.%m.%Y %H:%M')}</i>"""
+    🕐 <i>Время проверки: {self._now_text()}</i>""")
+                    message = "".join(parts)
                     logger.info("📱 Sending detailed summary (with changes)")
 
-                await self.bot.send_message(
-                    chat_id=settings.telegram_chat_id,
+                await self._send_message(
                     text=message,
                     parse_mode=ParseMode.HTML
                 )
 
-                logger.info(
-                    f"✅ Daily changes summary sent successfully: {total_changes} changes in {total_checked} cars")
+                logger.info("✅ Daily changes summary sent successfully: %s changes in %s cars",
+                            total_changes, total_checked)
 
             except Exception as e:
-                logger.error(f"❌ Error sending daily changes summary: {str(e)}")
-                logger.debug(f"🔍 Exception details: {type(e).__name__}: {str(e)}")
+                logger.error("❌ Error sending daily changes summary: %s", e)
+                logger.debug("🔍 Exception details: %s: %s", type(e).__name__, e)
 
     async def send_price_drops_alert(self, cars_with_drops: List, min_drop: int):
             """💸 Отправляет уведомление о значительных падениях цен"""
@@ -697,84 +1066,86 @@ class TelegramService:
                 return
 
             try:
-                message = f"""💸💸 <b>ЗНАЧИТЕЛЬНЫЕ ПАДЕНИЯ ЦЕН!</b> 💸💸
+                parts = [f"""💸💸 <b>ЗНАЧИТЕЛЬНЫЕ ПАДЕНИЯ ЦЕН!</b> 💸💸
 
     🎯 Найдено {len(cars_with_drops)} объявлений со снижением цены на {min_drop}€+
 
-    """
+    """]
 
                 for i, car in enumerate(cars_with_drops[:5], 1):  # Показываем топ-5
-                    old_price_num = self._extract_price_number(car.previous_price)
-                    new_price_num = self._extract_price_number(car.price)
+                    old_price_num = extract_price_number(car.previous_price)
+                    new_price_num = extract_price_number(car.price)
 
                     if old_price_num and new_price_num:
                         drop_amount = old_price_num - new_price_num
                         drop_percent = (drop_amount / old_price_num) * 100
 
-                        message += f"""<b>{i}. {car.brand} {car.year or ''}</b>
-    📝 {car.title[:50]}{'...' if len(car.title) > 50 else ''}
-    💰 Было: {car.previous_price} → Стало: {car.price}
+                        parts.append(f"""<b>{i}. {_esc(car.brand or '')} {car.year or ''}</b>
+    📝 {_esc(_ellipsize(car.title or '', 50))}
+    💰 Было: {_esc(car.previous_price)} → Стало: {_esc(car.price)}
     📉 Снижение: -{drop_amount:,}€ ({drop_percent:.1f}%)
-    🔗 <a href="{car.link}">Посмотреть</a>
+    🔗 <a href="{_esc(car.link or '', quote=True)}">Посмотреть</a>
 
-    """
+    """)
 
                 if len(cars_with_drops) > 5:
-                    message += f"<i>... и еще {len(cars_with_drops) - 5} объявлений</i>\n\n"
+                    parts.append(f"<i>... и еще {len(cars_with_drops) - 5} объявлений</i>\n\n")
 
-                message += "🏃‍♂️ <i>Возможно, срочная продажа или торг!</i>"
+                parts.append("🏃‍♂️ <i>Возможно, срочная продажа или торг!</i>")
+                message = "".join(parts)
 
-                await self.bot.send_message(
-                    chat_id=settings.telegram_chat_id,
+                await self._send_message(
                     text=message,
                     parse_mode=ParseMode.HTML,
                     disable_web_page_preview=False
                 )
 
-                logger.info(f"🚨 Price drops alert sent: {len(cars_with_drops)} cars with significant drops")
+                logger.info("🚨 Price drops alert sent: %s cars with significant drops", len(cars_with_drops))
 
             except Exception as e:
-                logger.error(f"❌ Error sending price drops alert: {e}")
+                logger.error("❌ Error sending price drops alert: %s", e)
 
-    def _analyze_price_change(self, old_price: str, new_price: str) -> str:
-            """Анализирует изменение цены и возвращает эмодзи + описание"""
-            try:
-                old_num = self._extract_price_number(old_price)
-                new_num = self._extract_price_number(new_price)
+    def _analyze_price_change(self, old_price: str, new_price: str,
+                              old_num: Optional[int] = None, new_num: Optional[int] = None) -> str:
+            """Анализирует изменение цены и возвращает эмодзи + описание.
 
-                if not old_num or not new_num:
-                    return "🔄 Изменение цены"
+            Если вызывающий уже знает числовые цены (old_num/new_num), строки повторно не разбираются
+            """
+            if old_num is None:
+                old_num = extract_price_number(old_price)
+            if new_num is None:
+                new_num = extract_price_number(new_price)
 
-                diff = new_num - old_num
-                percent_change = (diff / old_num) * 100
+            if not old_num or not new_num:
+                return "🔄 Изменение цены"
 
-                if diff > 0:
-                    if percent_change > 10:
-                        return f"📈 Значительное повышение (+{diff:,}€, +{percent_change:.1f}%)"
-                    else:
-                        return f"📈 Повышение (+{diff:,}€, +{percent_change:.1f}%)"
-                elif diff < 0:
-                    if abs(percent_change) > 10:
-                        return f"📉 Значительное снижение ({diff:,}€, {percent_change:.1f}%) 🎯"
-                    else:
-                        return f"📉 Снижение ({diff:,}€, {percent_change:.1f}%)"
-                else:
-                    return "🔄 Цена не изменилась (возможно, формат)"
+            diff = new_num - old_num
+            if not diff:
+                return _PRICE_UNCHANGED
+
+            percent_change = (diff / old_num) * 100
+            bucket = (0 if diff > 0 else 2) + (0 if abs(percent_change) > 10 else 1)
+            return _PRICE_CHANGE_TEMPLATES[bucket](d=diff, p=percent_change)
+
+
+# Общие на весь процесс объекты: один Bot = один пул keep-alive соединений к api.telegram.org
+_bot: Optional[Bot] = None
+_telegram_service: Optional[TelegramService] = None
+
+
+def get_bot() -> Bot:
+    """Возвращает общий Bot, создает его при первом обращении"""
+    global _bot
+    if _bot is None:
+        # orjson вместо stdlib json: параметры запроса и ответы Telegram (де)сериализуются на каждой отправке
+        session = AiohttpSession(limit=20, json_loads=orjson.loads, json_dumps=_orjson_dumps)
+        _bot = Bot(token=settings.telegram_bot_token, session=session)
+    return _bot
 
-            except Exception:
-                return "🔄 Изменение цены"
 
-    def _extract_price_number(self, price_text: str) -> Optional[int]:
-            """Извлекает число из текста цены"""
-            import re
-            if not price_text:
-                return None
-
-            # Убираем все кроме цифр
-            numbers = re.findall(r'\d+', price_text.replace(',', '').replace(' ', ''))
-            if numbers:
-                try:
-                    return int(''.join(numbers))
-                except:
-                    return None
-            return None
+def get_telegram_service() -> TelegramService:
+    """Возвращает общий TelegramService, создает его при первом обращении"""
+    global _telegram_service
+    if _telegram_service is None:
+        _telegram_service = TelegramService()
+    return _telegram_service
@@ -2,76 +2,114 @@
 """
 Startup script для инициализации Alembic и запуска приложения
 """
+import asyncio
 import os
+import socket
 import subprocess
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import aiomysql
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+
+MYSQL_HOST = "mysql"
+MYSQL_PORT = 3306
+MYSQL_PARAMS = dict(host=MYSQL_HOST, port=MYSQL_PORT, user="caruser", password="carpass", db="car_monitor")
+
+# Одно соединение с MySQL на весь startup: проверка готовности и очистка идут через него,
+# без повторного TCP + auth handshake. Соединение привязано к своему event loop
+_loop = asyncio.new_event_loop()
+_conn = None
+
 
 def wait_for_mysql():
     """Ждем готовности MySQL"""
     print("[STARTUP] Ожидание MySQL...")
     max_retries = 30
     for i in range(max_retries):
+        # Дешевая проверка порта в этом же процессе - без запуска нового интерпретатора на каждую попытку
         try:
-            result = subprocess.run([
-                "python", "-c",
-                "import aiomysql; import asyncio; asyncio.run(aiomysql.connect(host='mysql', port=3306, user='caruser', password='carpass', db='car_monitor'))"
-            ], capture_output=True, timeout=5)
-            if result.returncode == 0:
+            with socket.create_connection((MYSQL_HOST, MYSQL_PORT), timeout=1):
+                pass
+        except OSError as e:
+            print(f"[STARTUP] Ошибка: {e}")
+        else:
+            # Порт открыт - один раз проверяем, что MySQL принимает логин
+            try:
+                _loop.run_until_complete(_connect_mysql())
                 print("[STARTUP] MySQL готов!")
                 return True
-        except Exception as e:
-            print(f"[STARTUP] Ошибка: {e}")
+            except Exception as e:
+                print(f"[STARTUP] Ошибка: {e}")
         print(f"[STARTUP] Попытка {i + 1}/{max_retries}...")
-        time.sleep(2)
+        # Экспоненциальная пауза: первые попытки частые (MySQL обычно поднимается за секунды), потом не чаще раза в 2с
+        time.sleep(min(0.1 * 2 ** i, 2))
     return False
 
 
+async def _connect_mysql():
+    global _conn
+    # Короткий таймаут: порт уже проверен, зависший handshake лучше быстро повторить
+    _conn = await aiomysql.connect(connect_timeout=1, **MYSQL_PARAMS)
+
+
+async def _clean_db():
+    async with _conn.cursor() as cursor:
+        # Удаляем таблицы alembic_version и cars (если существуют) одним запросом
+        await cursor.execute("DROP TABLE IF EXISTS alembic_version, cars")
+    await _conn.commit()
+
+
+async def _db_revisions() -> set:
+    async with _conn.cursor() as cursor:
+        try:
+            await cursor.execute("SELECT version_num FROM alembic_version")
+        except aiomysql.ProgrammingError:
+            # Таблицы alembic_version еще нет - миграции не применялись
+            return set()
+        return {row[0] for row in await cursor.fetchall()}
+
+
+def schema_is_current() -> bool:
+    """True, если база уже на последней миграции (обычный рестарт с тем же образом)"""
+    heads = set(ScriptDirectory.from_config(Config("alembic.ini")).get_heads())
+    try:
+        current = _loop.run_until_complete(_db_revisions())
+    except Exception as e:
+        print(f"[STARTUP] ⚠️ Не удалось прочитать версию схемы: {e}")
+        return False
+    return bool(heads) and current == heads
+
+
+def close_mysql():
+    """Закрывает общее startup-соединение с MySQL"""
+    if _conn is not None:
+        _conn.close()
+    _loop.close()
+
+
 def clean_alembic_state():
     """Очищает состояние alembic в базе данных"""
     print("[STARTUP] Очистка состояния Alembic в базе...")
     try:
-        clean_script = """
-import aiomysql
-import asyncio
-
-async def clean_db():
-    conn = await aiomysql.connect(
-        host='mysql', port=3306, 
-        user='caruser', password='carpass', 
-        db='car_monitor'
-    )
-    async with conn.cursor() as cursor:
-        # Удаляем таблицу alembic_version если существует
-        await cursor.execute("DROP TABLE IF EXISTS alembic_version")
-        # Удаляем таблицу cars если существует
-        await cursor.execute("DROP TABLE IF EXISTS cars")
-        await conn.commit()
-        print("База данных очищена")
-    conn.close()
-
-asyncio.run(clean_db())
-"""
-        result = subprocess.run([
-            "python", "-c", clean_script
-        ], capture_output=True, timeout=10, text=True)
-
-        if result.returncode == 0:
-            print("[STARTUP] ✅ База данных очищена")
-            return True
-        else:
-            print(f"[STARTUP] ⚠️ Ошибка очистки: {result.stderr}")
-            return False
+        _loop.run_until_complete(_clean_db())
+        print("[STARTUP] ✅ База данных очищена")
+        return True
 
     except Exception as e:
         print(f"[STARTUP] ⚠️ Не удалось очистить базу: {e}")
         return False
 
 
-def init_alembic():
-    """Инициализация Alembic"""
+def prepare_alembic_files() -> bool:
+    """Файловая подготовка Alembic (alembic.ini, env.py, versions) - MySQL не нужен.
+
+    Возвращает True, если файлы миграций уже есть
+    """
     if not Path("alembic.ini").exists():
         print("[STARTUP] Инициализация Alembic...")
         subprocess.run(["alembic", "init", "alembic"], check=True)
@@ -94,6 +132,7 @@ def init_alembic():
 import os
 from logging.config import fileConfig
 from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from alembic import context
 
 # this is the Alembic Config object
@@ -142,6 +181,7 @@ async def run_async_migrations():
     """
     connectable = create_async_engine(
         config.get_main_option("sqlalchemy.url"),
+        poolclass=NullPool,  # Миграциям нужно одно соединение
         echo=True  # Для отладки
     )
 
@@ -166,36 +206,36 @@ else:
 
     # Проверяем есть ли уже миграции
     versions_dir = Path("alembic/versions")
-    if not versions_dir.exists():
-        versions_dir.mkdir(exist_ok=True)
+    versions_dir.mkdir(exist_ok=True)
+
+    # Проверяем есть ли файлы миграций - останавливаемся на первом найденном, список не строим
+    return any(versions_dir.glob("*.py"))
+
+
+def init_alembic(has_migrations: bool):
+    """Инициализация Alembic: первая миграция (если нужно) и применение миграций"""
+    # Alembic вызываем через Python API в этом же процессе - без отдельного интерпретатора
+    # и повторного импорта SQLAlchemy/моделей на каждую команду
+    alembic_cfg = Config("alembic.ini")
+    versions_dir = Path("alembic/versions")
 
-    # Проверяем есть ли файлы миграций
-    migration_files = list(versions_dir.glob("*.py"))
-    if not migration_files:
+    if not has_migrations:
         print("[STARTUP] Создание первой миграции...")
 
         # Сначала попробуем создать пустую миграцию
         try:
-            subprocess.run([
-                "alembic", "revision",
-                "--autogenerate",
-                "-m", "Initial migration"
-            ], check=True, capture_output=True, text=True)
+            command.revision(alembic_cfg, message="Initial migration", autogenerate=True)
             print("[STARTUP] ✅ Автогенерированная миграция создана")
-        except subprocess.CalledProcessError as e:
+        except Exception as e:
             print(f"[STARTUP] ⚠️ Автогенерация не удалась: {e}")
             print("[STARTUP] Создаем базовую миграцию вручную...")
 
             # Создаем миграцию вручную
-            result = subprocess.run([
-                "alembic", "revision",
-                "-m", "Initial migration"
-            ], check=True, capture_output=True, text=True)
+            command.revision(alembic_cfg, message="Initial migration")
 
-            # Находим созданный файл миграции
-            migration_files = list(versions_dir.glob("*.py"))
-            if migration_files:
-                migration_file = migration_files[-1]  # Последний созданный
+            # Находим созданный файл миграции (самый свежий по времени изменения)
+            migration_file = max(versions_dir.glob("*.py"), key=lambda p: p.stat().st_mtime, default=None)
+            if migration_file:
 
                 # Заполняем миграцию содержимым
                 migration_content = f'''"""Initial migration
@@ -263,42 +303,57 @@ def downgrade():
 
     print("[STARTUP] Применение миграций...")
     try:
-        result = subprocess.run(["alembic", "upgrade", "head"],
-                                check=True, capture_output=True, text=True)
+        command.upgrade(alembic_cfg, "head")
         print("[STARTUP] ✅ Миграции применены успешно")
-    except subprocess.CalledProcessError as e:
-        print(f"[STARTUP] ❌ Ошибка применения миграций:")
-        print(f"Return code: {e.returncode}")
-        if e.stdout:
-            print(f"STDOUT: {e.stdout}")
-        if e.stderr:
-            print(f"STDERR: {e.stderr}")
+    except Exception as e:
+        print(f"[STARTUP] ❌ Ошибка применения миграций: {type(e).__name__}: {e}")
 
         # Попробуем показать текущее состояние alembic
         try:
-            current_result = subprocess.run(["alembic", "current"],
-                                            capture_output=True, text=True)
-            print(f"Alembic current: {current_result.stdout}")
-        except:
+            print("Alembic current:")
+            command.current(alembic_cfg)
+        except Exception:
             pass
 
         raise
 
 
 if __name__ == "__main__":
-    if not wait_for_mysql():
+    # Файловая подготовка Alembic не зависит от MySQL - делаем ее в потоке, пока ждем базу
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        fs_future = executor.submit(prepare_alembic_files)
+        mysql_ready = wait_for_mysql()
+
+    if not mysql_ready:
         print("[ERROR] MySQL недоступен")
         sys.exit(1)
 
-    # Очищаем состояние базы данных
-    clean_alembic_state()
-
     try:
-        init_alembic()
-        print("[STARTUP] ✅ База данных инициализирована")
+        has_migrations = fs_future.result()
     except Exception as e:
         print(f"[ERROR] Ошибка инициализации базы: {e}")
         sys.exit(1)
 
+    # Схема уже на последней миграции - данные не удаляем и миграции заново не применяем
+    if has_migrations and schema_is_current():
+        print("[STARTUP] ✅ Схема базы актуальна - очистка и миграции пропущены")
+        close_mysql()
+    else:
+        # Очищаем состояние базы данных
+        clean_alembic_state()
+        close_mysql()
+
+        try:
+            init_alembic(has_migrations)
+            print("[STARTUP] ✅ База данных инициализирована")
+        except Exception as e:
+            print(f"[ERROR] Ошибка инициализации базы: {e}")
+            sys.exit(1)
+
     print("[STARTUP] Запуск FastAPI...")
-    os.system("uvicorn app.main:app --host 0.0.0.0 --port 8000")
\ No newline at end of file
+    # uvicorn заменяет текущий процесс: без /bin/sh посередине, SIGTERM от Docker доходит напрямую,
+    # а память startup-интерпретатора (Alembic, модели) освобождается.
+    # Один worker: APScheduler живет внутри приложения, несколько worker'ов дублировали бы уведомления
+    # stdout без TTY (Docker) буферизуется блоками - execvp не сбрасывает буфер Python, сбрасываем сами
+    sys.stdout.flush()
+    os.execvp("uvicorn", ["uvicorn", "app.main:app", "--host", "0.0.0.0", "--port", "8000"])